@@ -1,11 +1,89 @@
-from flask import Flask, jsonify, request
+import base64
+import json
+import math
+import os
+import numpy as np
+from flask import Blueprint, Flask, Response, jsonify, request, url_for
 from flask_cors import CORS
-from weather_pred1 import WeatherQuantumForecaster  # Adjust to match your file structure
+from forecaster_pool import ForecasterPool, PoolTimeout
+from forecast_service import LocationNotFound, compute_forecast_series, run_forecast_job
+from geocoding import get_default_geocoder, normalize_query
+from grid_store import INDEX_FILE, GridStore
+from image_store import IMAGE_ID, plot_image_store
+from instrumentation import cache_collector, instrument_app, registry
+from jobs import JobManager, QueueFull
+from param_store import ParameterStore
+from plot_renderer import default_renderer
+from rolling_series import default_series_store
+from singleflight import FlightTimeout, SingleFlight
+from weather_pred1 import WeatherQuantumForecaster, ensemble_to_json
+from weather_series import WeatherSeries, compress_response, negotiate_series_response
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for cross-origin requests
+bp = Blueprint("forecast", __name__)
+
+# Model width and simulation backend; wide models (up to ~22 qubits) want FORECAST_BACKEND=statevector
+N_QUBITS = int(os.environ.get("FORECAST_N_QUBITS", "4"))
+BACKEND = os.environ.get("FORECAST_BACKEND", "numpy")
+
+# Long-lived forecasters shared by all requests; warmed up before the first request arrives
+forecaster_pool = ForecasterPool(size=int(os.environ.get("FORECASTER_POOL_SIZE", "4")),
+                                 factory=lambda n_qubits: WeatherQuantumForecaster(n_qubits=n_qubits, backend=BACKEND))
+forecaster_pool.warm_up(n_qubits=N_QUBITS)
+
+# Trained parameters reused across requests (persisted when WEATHER_PARAM_STORE is set)
+parameter_store = ParameterStore(path=os.environ.get("WEATHER_PARAM_STORE") or None)
+
+# Background forecasts for POST /forecast/jobs; the process pool starts on the first job
+job_manager = JobManager(max_workers=int(os.environ.get("FORECAST_JOB_WORKERS", "0")) or None,
+                         max_pending=int(os.environ.get("FORECAST_JOB_MAX_PENDING", "64")),
+                         ttl=float(os.environ.get("FORECAST_JOB_TTL", "600")))
 
-@app.route('/forecast', methods=['POST'])
+# Plot PNGs by content hash, in a directory every worker process can serve from
+plot_images = plot_image_store()
+
+# Identical concurrent /forecast requests share one computation, reused for a short window
+forecast_flight = SingleFlight("forecast", reuse_window=float(os.environ.get("FORECAST_COALESCE_WINDOW", "1.0")),
+                               timeout=float(os.environ.get("FORECAST_COALESCE_TIMEOUT", "60")),
+                               shared_errors=(LocationNotFound,))
+
+def _pool_metrics():
+    stats = forecaster_pool.stats()
+    for n_qubits, pool in stats["pools"].items():
+        yield ("weather_forecaster_pool_in_use", "gauge", "Forecasters currently borrowed.",
+               {"n_qubits": n_qubits}, pool["in_use"])
+        yield ("weather_forecaster_pool_utilization", "gauge", "Fraction of the pool borrowed.",
+               {"n_qubits": n_qubits}, pool["utilization"])
+    yield ("weather_forecaster_pool_wait_seconds_avg", "gauge", "Average wait to borrow a forecaster.",
+           {}, stats["avg_wait_seconds"])
+    yield ("weather_forecaster_pool_timeouts", "gauge", "Pool acquisitions that timed out.", {}, stats["timeouts"])
+
+registry.register_collector("forecaster_pool", _pool_metrics)
+registry.register_collector("geocode", cache_collector("geocode", lambda: get_default_geocoder().stats()))
+registry.register_collector("parameters", cache_collector("parameters", parameter_store.stats))
+registry.register_collector("forecast_plot", cache_collector("forecast_plot", default_renderer.cache.stats))
+registry.register_collector("plot_images", cache_collector("plot_images", plot_images.stats))
+registry.register_collector("rolling_series", cache_collector("rolling_series", default_series_store.stats))
+
+MAX_ENSEMBLE_MEMBERS = 5000
+
+def _parse_ensemble(options):
+    """Validate the optional ``ensemble`` request field; raises ValueError with a client-facing message."""
+    if options is None:
+        return None
+    if not isinstance(options, dict):
+        raise ValueError("'ensemble' must be an object.")
+    try:
+        members = int(options.get("members", 500))
+        quantiles = [float(q) for q in options.get("quantiles") or ()]
+        thresholds = {str(name): [float(t) for t in values]
+                      for name, values in (options.get("thresholds") or {}).items()}
+    except (TypeError, ValueError, AttributeError):
+        raise ValueError("Ensemble parameters must be numbers.")
+    if not 1 <= members <= MAX_ENSEMBLE_MEMBERS or not all(0 <= q <= 1 for q in quantiles):
+        raise ValueError("Ensemble parameters out of range.")
+    return {"members": members, "quantiles": quantiles, "thresholds": thresholds}
+
+@bp.route('/forecast', methods=['POST'])
 def forecast():
     try:
         # Parse JSON request data
@@ -13,38 +91,206 @@ def forecast():
         if not data or 'location' not in data:
             return jsonify({"error": "Missing 'location' field in the request."}), 400
 
-        location_query = data["location"]
-        forecaster = WeatherQuantumForecaster(n_qubits=4)
-
-        # Search for locations matching the query
-        locations = forecaster.search_locations(location_query)
-        if not locations:
-            return jsonify({"error": "Location not found"}), 404
+        try:
+            ensemble = _parse_ensemble(data.get("ensemble"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        # Use the first found location for simplicity
-        location = locations[0]
-        latitude = location['lat']
-
-        # Generate weather data
-        weather_data, timestamps = forecaster.generate_simulated_weather_data(latitude)
+        location_query = data["location"]
 
-        # Train the quantum model (optional)
-        optimized_params, final_cost = forecaster.train_model(weather_data["temperature"])
+        def compute():
+            with forecaster_pool.acquire(n_qubits=N_QUBITS) as forecaster:
+                location, series, png, stats = compute_forecast_series(forecaster, parameter_store,
+                                                                       location_query, ensemble)
+            extra = {"plot_url": url_for("forecast.get_plot", image_id=plot_images.put(png))}
+            if stats is not None:
+                extra["ensemble"] = ensemble_to_json(stats)
+            return location, series, png, extra
 
-        # Generate the base64 plot image
-        plot_image = forecaster.visualize_forecast(weather_data, timestamps, location["address"])
+        key = (normalize_query(location_query), json.dumps(ensemble, sort_keys=True))
+        location, series, png, extra = forecast_flight.do(key, compute)
+        if request.args.get("plot") == "inline":
+            # For clients that still expect the image embedded in the body
+            extra = dict(extra, plot_image=base64.b64encode(png).decode("utf-8"))
 
-        # Respond with weather data and plot image
-        return jsonify({
-            "weather_data": weather_data,
-            "timestamps": [ts.isoformat() for ts in timestamps],
-            "location": location,
-            "plot_image": plot_image
-        })
+        # Respond with weather data, plot URL and ensemble (JSON), or the bare series as .npy / raw arrays
+        time_format = request.args.get("time_format", "iso")
+        return negotiate_series_response(series, {"location": location}, extra, time_format=time_format)
 
+    except LocationNotFound:
+        return jsonify({"error": "Location not found"}), 404
+    except (PoolTimeout, FlightTimeout):
+        return jsonify({"error": "Server busy, please retry"}), 503
     except Exception as e:
         print(f"Error occurred: {e}")  # Optional logging for debugging
         return jsonify({"error": "Internal server error"}), 500
 
+# Plot URLs are content-addressed, so a URL's bytes never change and caches may keep them indefinitely
+PLOT_MAX_AGE = 31536000
+
+@bp.route('/plots/<image_id>.png', methods=['GET'])
+def get_plot(image_id):
+    if not IMAGE_ID.fullmatch(image_id):
+        return jsonify({"error": "Plot not found"}), 404
+    headers = {"ETag": f'"{image_id}"', "Cache-Control": f"public, max-age={PLOT_MAX_AGE}, immutable"}
+    # The id is the hash of the bytes, so a matching validator holds even if the image was swept
+    if image_id in request.if_none_match:
+        return Response(status=304, headers=headers)
+    png = plot_images.get(image_id)
+    if png is None:
+        return jsonify({"error": "Plot not found"}), 404
+    return Response(png, mimetype="image/png", headers=headers)
+
+MAX_STREAM_DAYS = 3660
+MAX_STREAM_SAMPLES = 200000  # About ten years either side at hourly steps
+MAX_STREAM_CHUNK = 10000
+MAX_STREAM_STEP_HOURS = 24 * MAX_STREAM_DAYS
+
+def _stream_events(location, chunks, sse):
+    """Encode the location header, series chunks and a trailer as NDJSON lines or SSE events."""
+    def encode(event, payload):
+        body = json.dumps(payload, separators=(",", ":"))
+        return f"event: {event}\ndata: {body}\n\n" if sse else body + "\n"
+
+    yield encode("location", {"location": location})
+    count = 0
+    for weather_data, timestamps in chunks:
+        count += len(timestamps)
+        yield encode("series", WeatherSeries(timestamps, weather_data).to_json_payload())
+    yield encode("done", {"done": True, "count": count})
+
+@bp.route('/forecast/stream', methods=['POST'])
+def forecast_stream():
+    data = request.get_json(silent=True)
+    if not data or 'location' not in data:
+        return jsonify({"error": "Missing 'location' field in the request."}), 400
+    try:
+        days_past = float(data.get("days_past", 30))
+        days_future = float(data.get("days_future", 14))
+        step_hours = float(data.get("step_hours", 4))
+        chunk_size = int(data.get("chunk_size", 1024))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Horizon parameters must be numbers."}), 400
+    # Checked before the response starts: time_grid overflows on huge or infinite values mid-stream
+    if not (all(map(math.isfinite, (days_past, days_future, step_hours)))
+            and 0 <= days_past <= MAX_STREAM_DAYS and 0 <= days_future <= MAX_STREAM_DAYS
+            and 0 < step_hours <= MAX_STREAM_STEP_HOURS and 0 < chunk_size <= MAX_STREAM_CHUNK):
+        return jsonify({"error": "Horizon parameters out of range."}), 400
+    if (days_past + days_future) * 24 / step_hours > MAX_STREAM_SAMPLES:
+        return jsonify({"error": f"At most {MAX_STREAM_SAMPLES} samples per stream; increase step_hours."}), 400
+
+    try:
+        with forecaster_pool.acquire(n_qubits=N_QUBITS) as forecaster:
+            locations = forecaster.search_locations(data["location"])
+    except PoolTimeout:
+        return jsonify({"error": "Server busy, please retry"}), 503
+    if not locations:
+        return jsonify({"error": "Location not found"}), 404
+    location = locations[0]
+
+    # The generator does not depend on forecaster state, so the pooled instance is not held while streaming
+    chunks = forecaster.iter_simulated_weather_data(location["lat"], days_past, days_future,
+                                                    step_hours=step_hours, chunk_size=chunk_size)
+    sse = request.accept_mimetypes.best_match(["application/x-ndjson", "text/event-stream"]) == "text/event-stream"
+    return Response(_stream_events(location, chunks, sse),
+                    mimetype="text/event-stream" if sse else "application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Precomputed region written by `python grid_store.py build`; reopened when a new cycle lands
+GRID_STORE_PATH = os.environ.get("WEATHER_GRID_STORE")
+MAX_GRID_CELLS = 2500
+_grid = {"mtime": None, "store": None}
+
+def _grid_store():
+    """The current store, or None while no build has finished (no index.json yet)."""
+    try:
+        index_mtime = os.path.getmtime(os.path.join(GRID_STORE_PATH, INDEX_FILE))
+        if _grid["mtime"] != index_mtime:
+            _grid["store"], _grid["mtime"] = GridStore(GRID_STORE_PATH), index_mtime
+    except FileNotFoundError:
+        return None
+    return _grid["store"]
+
+def _grid_unavailable():
+    if not GRID_STORE_PATH:
+        return jsonify({"error": "No grid store configured"}), 404
+    return jsonify({"error": "Grid store is not built yet"}), 503
+
+@bp.route('/forecast/grid/point', methods=['GET'])
+def grid_point():
+    store = _grid_store() if GRID_STORE_PATH else None
+    if store is None:
+        return _grid_unavailable()
+    try:
+        series = store.point(float(request.args["lat"]), float(request.args["lon"]))
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Invalid point: {e}"}), 400
+    return negotiate_series_response(series, {"lat": float(request.args["lat"]), "lon": float(request.args["lon"])},
+                                     time_format=request.args.get("time_format", "iso"))
+
+@bp.route('/forecast/grid/bbox', methods=['GET'])
+def grid_bbox():
+    store = _grid_store() if GRID_STORE_PATH else None
+    if store is None:
+        return _grid_unavailable()
+    try:
+        bounds = [float(request.args[name]) for name in ("lat_min", "lat_max", "lon_min", "lon_max")]
+    except (KeyError, ValueError):
+        return jsonify({"error": "lat_min, lat_max, lon_min and lon_max are required numbers"}), 400
+    # Size the selection from the axes before reading any cells
+    lat_sel, lon_sel = store.select(*bounds)
+    if len(lat_sel) * len(lon_sel) > MAX_GRID_CELLS:
+        return jsonify({"error": f"At most {MAX_GRID_CELLS} cells per query"}), 400
+    latitudes, longitudes, columns = store.bbox(*bounds)
+    timestamps = WeatherSeries(store.timestamps, {}).timestamps_json(request.args.get("time_format", "iso"))
+    return compress_response(jsonify({
+        "latitudes": latitudes.tolist(),
+        "longitudes": longitudes.tolist(),
+        "timestamps": timestamps,
+        "weather_data": {name: np.round(values.astype(np.float64), 4).tolist() for name, values in columns.items()},
+    }))
+
+@bp.route('/forecast/jobs', methods=['POST'])
+def submit_forecast_job():
+    data = request.get_json()
+    if not data or 'location' not in data:
+        return jsonify({"error": "Missing 'location' field in the request."}), 400
+    try:
+        job_id = job_manager.submit(run_forecast_job, data["location"], N_QUBITS, BACKEND)
+    except QueueFull:
+        return jsonify({"error": "Too many pending jobs, please retry later"}), 429
+    return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/forecast/jobs/{job_id}"}), 202
+
+@bp.route('/forecast/jobs/<job_id>', methods=['GET'])
+def get_forecast_job(job_id):
+    info = job_manager.status(job_id)
+    if info is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(info)
+
+@bp.route('/forecast/jobs/<job_id>', methods=['DELETE'])
+def cancel_forecast_job(job_id):
+    if not job_manager.cancel(job_id):
+        return jsonify({"error": "Job is unknown or already finished"}), 404
+    return jsonify({"job_id": job_id, "status": "cancelled"})
+
+@bp.route('/pool/stats', methods=['GET'])
+def pool_stats():
+    return jsonify(forecaster_pool.stats())
+
+@bp.route('/forecast/coalesce/stats', methods=['GET'])
+def coalesce_stats():
+    return jsonify(forecast_flight.stats())
+
+@bp.route('/params/stats', methods=['GET'])
+def params_stats():
+    return jsonify(parameter_store.stats())
+
+# Standalone service; service.create_app mounts the blueprint alongside the others
+app = Flask(__name__)
+CORS(app)  # Enable CORS for cross-origin requests
+app.register_blueprint(bp)
+instrument_app(app, "forecast")
+
 if __name__ == "__main__":
     app.run(debug=True, port=5000)  # Specify port 5000 for the first app
@@ -0,0 +1,316 @@
+"""Benchmarks for the quantum, data-generation, plotting and HTTP hot paths.
+
+    python benchmarks.py --output results.json
+    python benchmarks.py --baseline results.json --threshold 0.25
+
+Every case reports min/median/mean wall time over ``--repeat`` runs and the
+peak traced allocation of one extra run.  With ``--baseline`` the medians are
+compared against a saved run and the exit status is 1 if any case slowed
+down by more than ``--threshold``.  Geocoding goes through an in-memory
+gazetteer, so no network access is needed.
+"""
+import argparse
+import gc
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+
+from geocoding import GazetteerBackend, Geocoder, set_default_geocoder
+
+GAZETTEER = [
+    {"name": "Paris", "address": "Paris, France", "lat": 48.8566, "lon": 2.3522},
+    {"name": "Sydney", "address": "Sydney, Australia", "lat": -33.8688, "lon": 151.2093},
+]
+
+Case = Tuple[str, Dict, Callable[[], Callable[[], object]]]
+
+
+def offline_geocoder():
+    set_default_geocoder(Geocoder([GazetteerBackend(GAZETTEER)]))
+
+
+def quantum_cases() -> Iterator[Case]:
+    from weather_pred1 import WeatherQuantumForecaster
+
+    for backend in ("numpy", "statevector", "cirq"):
+        for n_qubits in (2, 4, 8):
+            def setup(backend=backend, n_qubits=n_qubits):
+                forecaster = WeatherQuantumForecaster(n_qubits=n_qubits, backend=backend)
+                params = np.random.default_rng(0).normal(size=2 * n_qubits)
+                return lambda: forecaster.simulate_circuit(params)
+            yield "simulate_circuit", {"backend": backend, "n_qubits": n_qubits}, setup
+
+    # Full state-vector simulation at growing width; cirq simulates in complex64
+    from quantum_backends import CirqBackend, StateVectorBackend
+    scaling_backends = {
+        "statevector": StateVectorBackend,
+        "statevector-complex64": lambda n_qubits: StateVectorBackend(n_qubits, dtype=np.complex64),
+        "cirq": CirqBackend,
+    }
+    for backend, make_backend in scaling_backends.items():
+        for n_qubits in (12, 16, 18, 20, 22):
+            def setup(make_backend=make_backend, n_qubits=n_qubits):
+                simulator = make_backend(n_qubits)
+                params = np.random.default_rng(0).normal(size=2 * n_qubits)
+                return lambda: simulator.evaluate(params)
+            yield "state_vector_scaling", {"backend": backend, "n_qubits": n_qubits}, setup
+
+    for n_qubits in (2, 4, 6):
+        def setup(n_qubits=n_qubits):
+            forecaster = WeatherQuantumForecaster(n_qubits=n_qubits)
+            weather_data, _ = forecaster.generate_weather_arrays(45.0, seed=0)
+            initial_params = np.random.default_rng(0).normal(size=2 * n_qubits)
+            return lambda: forecaster.train_model(weather_data["temperature"], initial_params=initial_params)
+        yield "train_model", {"n_qubits": n_qubits}, setup
+
+
+def data_cases() -> Iterator[Case]:
+    from weather_pred1 import WeatherQuantumForecaster
+
+    for days_future in (14, 90, 365):
+        def setup(days_future=days_future):
+            forecaster = WeatherQuantumForecaster()
+            return lambda: forecaster.generate_simulated_weather_data(45.0, days_future=days_future)
+        yield "generate_simulated_weather_data", {"days_future": days_future}, setup
+
+    for cells in (16, 64):
+        def setup(cells=cells):
+            from weather_pred1 import simulate_weather_grid
+            forecaster = WeatherQuantumForecaster()
+            timestamps = forecaster.simulated_timestamps()
+            latitudes, longitudes = np.linspace(35, 60, cells), np.linspace(-10, 30, cells)
+            return lambda: simulate_weather_grid(latitudes, longitudes, timestamps, np.timedelta64(4, "h"))
+        yield "simulate_weather_grid", {"cells": f"{cells}x{cells}"}, setup
+
+    # Steady-state polling: the window is already current, so nothing is simulated
+    for days_future in (14, 365):
+        def setup(days_future=days_future):
+            from rolling_series import RollingSeriesStore
+            forecaster, store = WeatherQuantumForecaster(), RollingSeriesStore()
+            forecaster.rolling_weather_series(45.0, days_future=days_future, store=store)
+            return lambda: forecaster.rolling_weather_series(45.0, days_future=days_future, store=store)
+        yield "rolling_weather_series", {"days_future": days_future}, setup
+
+    for members in (100, 500, 1000):
+        def setup(members=members):
+            forecaster = WeatherQuantumForecaster()
+            thresholds = {"temperature": [30.0], "thunderstorm_chance": [20.0]}
+            return lambda: forecaster.generate_ensemble(45.0, members=members, thresholds=thresholds, seed=0)
+        yield "generate_ensemble", {"members": members}, setup
+
+
+def plotting_cases() -> Iterator[Case]:
+    from plot_renderer import default_renderer
+    from weather_pred1 import WeatherQuantumForecaster
+
+    for days_future in (14, 90):
+        def setup(days_future=days_future):
+            forecaster = WeatherQuantumForecaster()
+            weather_data, timestamps = forecaster.generate_simulated_weather_data(45.0, days_future=days_future)
+
+            def run():
+                default_renderer.cache.clear()  # Measure rendering, not cache hits
+                return forecaster.visualize_forecast(weather_data, timestamps, "Paris, France")
+            return run
+        yield "visualize_forecast", {"days_future": days_future}, setup
+
+
+def predictor_cases() -> Iterator[Case]:
+    from quantum_predictor import QuantumWeatherPredictor
+
+    for history_days in (30, 365, 3650):
+        for mode in ("sampled", "exact"):
+            def setup(history_days=history_days, mode=mode):
+                predictor = QuantumWeatherPredictor(location="Paris")
+                rng = np.random.default_rng(0)
+                base_date = datetime(2023, 1, 1)
+                history = [(base_date + timedelta(days=i), t) for i, t in enumerate(rng.uniform(-10, 45, history_days))]
+                return lambda: predictor.predict_extreme_weather(history, mode=mode)
+            yield "predict_extreme_weather", {"history_days": history_days, "mode": mode}, setup
+
+
+def heatmap_cases() -> Iterator[Case]:
+    import matplotlib.pyplot as plt
+    import for2
+
+    for n_samples in (10, 100):
+        def setup(n_samples=n_samples):
+            return lambda: for2.generate_weather_data(n_samples=n_samples, latitude=45.0)
+        yield "for2.generate_weather_data", {"n_samples": n_samples}, setup
+
+    def setup():
+        def run():
+            for2.visualize_weather_attributes(45.0)
+            plt.close("all")
+        return run
+    yield "for2.visualize_weather_attributes", {"n_samples": 10}, setup
+
+    for n_samples in (10, 200, 2000):
+        def setup(n_samples=n_samples):
+            return lambda: for2.render_weather_heatmaps(45.0, n_samples=n_samples)
+        yield "for2.render_weather_heatmaps", {"n_samples": n_samples}, setup
+
+
+def http_cases() -> Iterator[Case]:
+    from plot_renderer import default_renderer
+    from rolling_series import default_series_store
+
+    forecast_module = importlib.import_module("app")
+    visualization_module = importlib.import_module("for")
+    predict_module = importlib.import_module("extrem2")
+
+    def clear_forecast():
+        forecast_module.forecast_flight.results.clear()
+        forecast_module.parameter_store.entries.clear()
+        default_series_store.series.clear()
+        default_renderer.cache.clear()
+
+    def clear_predict():
+        predict_module.score_cache.memory.clear()
+        default_series_store.series.clear()
+
+    def clear_visualization():
+        visualization_module.visualization_flight.results.clear()
+        visualization_module.heatmap_cache.clear()
+
+    def request(client, path, payload, clear):
+        def run():
+            clear()  # Time the full computation, not the coalescing window and result caches
+            response = client.post(path, json=payload)
+            assert response.status_code == 200, response.status_code
+            return response.get_data()
+        return run
+
+    cases = [
+        ("http /forecast", forecast_module, "/forecast", {"location": "Paris"}, clear_forecast),
+        ("http /predict", predict_module, "/predict", {"location": "Paris"}, clear_predict),
+        ("http /get_weather_visualization", visualization_module, "/get_weather_visualization", {"city": "Paris"},
+         clear_visualization),
+    ]
+    for name, module, path, payload, clear in cases:
+        def setup(module=module, path=path, payload=payload, clear=clear):
+            return request(module.app.test_client(), path, payload, clear)
+        yield name, {"cache": "cold"}, setup
+
+        def setup(module=module, path=path, payload=payload):
+            return request(module.app.test_client(), path, payload, lambda: None)
+        yield name, {"cache": "warm"}, setup
+
+
+SUITES = {
+    "quantum": quantum_cases,
+    "data": data_cases,
+    "plotting": plotting_cases,
+    "predictor": predictor_cases,
+    "heatmap": heatmap_cases,
+    "http": http_cases,
+}
+
+
+def case_id(name: str, params: Dict) -> str:
+    return name + "".join(f" {key}={value}" for key, value in sorted(params.items()))
+
+
+def measure(run: Callable[[], object], repeat: int) -> Dict:
+    run()  # Warm-up
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "repeat": repeat,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_suites(names: List[str], repeat: int, match: str = "") -> List[Dict]:
+    results = []
+    for suite in names:
+        for name, params, setup in SUITES[suite]():
+            identifier = case_id(name, params)
+            if match and match not in identifier:
+                continue
+            stats = measure(setup(), repeat)
+            results.append(dict(id=identifier, suite=suite, name=name, params=params, **stats))
+            print(f"{identifier:<60} median {stats['median'] * 1e3:10.3f} ms  "
+                  f"peak {stats['peak_memory_bytes'] / 1024:10.1f} KiB")
+    return results
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> List[Dict]:
+    """Cases whose median exceeds the baseline median by more than ``threshold`` (a fraction)."""
+    previous = {entry["id"]: entry for entry in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for entry in results:
+        old = previous.get(entry["id"])
+        if old is None:
+            continue
+        change = entry["median"] / old["median"] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{entry['id']:<60} {old['median'] * 1e3:10.3f}ms {entry['median'] * 1e3:10.3f}ms {change:+8.1%}{flag}")
+        if flag:
+            regressions.append(dict(entry, baseline_median=old["median"], change=change))
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES),
+                        help="Suite to run (repeatable); defaults to all")
+    parser.add_argument("--match", default="", help="Only run cases whose id contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed median slowdown before flagging a regression (fraction)")
+    args = parser.parse_args(argv)
+
+    offline_geocoder()
+    results = run_suites(args.suite or list(SUITES), args.repeat, args.match)
+    report = {
+        "meta": {
+            "created": datetime.utcnow().isoformat(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Train forecaster models for many locations in parallel.
+
+    python bulk_train.py --sites sites.csv --output params.jsonl
+    python bulk_train.py "Paris, France" "Tokyo" --workers 8 --param-store params.json
+
+Sites come from a gazetteer-style CSV/JSON file (``name``, ``lat``, ``lon``)
+and/or location names geocoded with the default geocoder.  The training
+series are written once into a shared-memory block that every worker maps,
+so tasks only carry row indices.  Results are streamed to the JSONL
+``--output`` file in completion order as they arrive.
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Each worker trains one model at a time; extra BLAS threads would only contend for the same cores
+WORKER_ENV = {"OMP_NUM_THREADS": "1", "OPENBLAS_NUM_THREADS": "1", "MKL_NUM_THREADS": "1"}
+
+_worker = {}
+
+
+@contextlib.contextmanager
+def _environment(variables: Dict[str, str]):
+    saved = {key: os.environ.get(key) for key in variables}
+    os.environ.update(variables)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _init_worker(shm_name: str, shape, dtype: str, n_qubits: int, backend: str):
+    from weather_pred1 import WeatherQuantumForecaster
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker["shm"] = shm  # Keep the mapping alive for the lifetime of the worker
+    _worker["series"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker["forecaster"] = WeatherQuantumForecaster(n_qubits=n_qubits, backend=backend)
+
+
+def _train_rows(rows: Sequence[int], seed: int) -> List[Dict]:
+    forecaster = _worker["forecaster"]
+    results = []
+    for row in rows:
+        start = time.perf_counter()
+        initial_params = np.random.default_rng([seed, row]).normal(size=2 * forecaster.n_qubits)
+        params, cost, stats = forecaster.train_model(_worker["series"][row], initial_params=initial_params,
+                                                     return_stats=True)
+        results.append({
+            "index": row,
+            "params": params.tolist(),
+            "cost": float(cost),
+            "iterations": stats["iterations"],
+            "evaluations": stats["evaluations"],
+            "converged": stats["converged"],
+            "wall_time": time.perf_counter() - start,
+            "pid": os.getpid(),
+        })
+    return results
+
+
+def default_workers() -> int:
+    """Cores this process may run on (respecting CPU affinity where the platform exposes it)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return multiprocessing.cpu_count()
+
+
+def training_series(sites: Sequence[Dict], days_past: float = 30, days_future: float = 14,
+                    seed: int = 0, now: Optional[np.datetime64] = None) -> np.ndarray:
+    """[len(sites), T] temperature series, one reproducible simulation per site."""
+    from weather_pred1 import WeatherQuantumForecaster
+
+    forecaster = WeatherQuantumForecaster()
+    rows = [forecaster.generate_weather_arrays(float(site["lat"]), days_past, days_future,
+                                               seed=seed + i, now=now)[0]["temperature"]
+            for i, site in enumerate(sites)]
+    return np.vstack(rows) if rows else np.empty((0, 0))
+
+
+def bulk_train(sites: Sequence[Dict], series: np.ndarray, n_qubits: int = 4, backend: str = "numpy",
+               max_workers: Optional[int] = None, batch_size: int = 4, seed: int = 0) -> Iterator[Dict]:
+    """Train one model per row of ``series`` across a process pool, yielding results as they finish.
+
+    ``max_workers`` defaults to the usable core count.  Rows are sent in
+    batches of ``batch_size`` to amortize task overhead; each result carries
+    the row ``index``, site, parameters, cost, optimizer stats and training wall time.
+    """
+    max_workers = max_workers or default_workers()
+    series = np.ascontiguousarray(series, dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(series.nbytes, 1))
+    try:
+        np.ndarray(series.shape, dtype=series.dtype, buffer=shm.buf)[:] = series
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_worker,
+                                       initargs=(shm.name, series.shape, series.dtype.str, n_qubits, backend))
+        with executor:
+            # Spawned workers read WORKER_ENV at startup, and they start on submit(), so keep it set
+            # until every task has been submitted
+            with _environment(WORKER_ENV):
+                futures = [executor.submit(_train_rows, list(range(start, min(start + batch_size, len(series)))),
+                                           seed)
+                           for start in range(0, len(series), batch_size)]
+            for future in as_completed(futures):
+                for result in future.result():
+                    yield dict(site=sites[result["index"]], n_qubits=n_qubits, backend=backend, **result)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def load_sites(path: str) -> List[Dict]:
+    """Sites from a gazetteer-style file: a JSON list or a CSV with ``name``, ``lat`` and ``lon`` columns."""
+    from geocoding import read_gazetteer
+
+    return [{"name": entry.get("name") or entry.get("address"), "lat": float(entry["lat"]), "lon": float(entry["lon"])}
+            for entry in read_gazetteer(path)]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("locations", nargs="*", help="location names to geocode")
+    parser.add_argument("--sites", help="CSV or JSON file of sites with name, lat and lon")
+    parser.add_argument("--output", default="bulk_train_results.jsonl", help="JSONL results file")
+    parser.add_argument("--param-store", help="also store parameters in this ParameterStore file")
+    parser.add_argument("--workers", type=int, help="worker processes (default: usable cores)")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--n-qubits", type=int, default=4)
+    parser.add_argument("--backend", default="numpy")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sites = load_sites(args.sites) if args.sites else []
+    if args.locations:
+        from geocoding import get_default_geocoder
+        geocoder = get_default_geocoder()
+        for name in args.locations:
+            match = geocoder.geocode(name)
+            if match is None:
+                print(f"Skipping '{name}': location not found", file=sys.stderr)
+                continue
+            sites.append({"name": match["address"], "lat": match["lat"], "lon": match["lon"]})
+    if not sites:
+        parser.error("no sites to train")
+
+    series = training_series(sites, seed=args.seed)
+    store = forecaster = None
+    if args.param_store:
+        from param_store import ParameterStore
+        from weather_pred1 import WeatherQuantumForecaster
+        store = ParameterStore(maxsize=max(1024, len(sites)), path=args.param_store)
+        forecaster = WeatherQuantumForecaster(n_qubits=args.n_qubits)
+
+    start = time.perf_counter()
+    with open(args.output, "w") as out:
+        for done, result in enumerate(bulk_train(sites, series, args.n_qubits, args.backend, args.workers,
+                                                 args.batch_size, args.seed), 1):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            if store is not None:
+                # Same key train_with_store uses.  The server trains on its own rolling series, whose
+                # fingerprints differ from these, so the entries serve it as nearest-latitude warm starts
+                store.store(result["site"]["lat"], forecaster.normalize_data(series[result["index"]])[:10],
+                            np.array(result["params"]), result["cost"], save=False)
+            print(f"[{done}/{len(sites)}] {result['site']['name']}: cost {result['cost']:.6f} "
+                  f"in {result['wall_time']:.2f}s", file=sys.stderr)
+    if store is not None:
+        store.save()
+    print(f"Trained {len(sites)} models in {time.perf_counter() - start:.1f}s; results in {args.output}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
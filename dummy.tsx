@@ -43,7 +43,7 @@ const WeatherPrediction: React.FC = () => {
             const data = await response.json();
             setWeatherData(data.weather_data);
             setTimestamps(data.timestamps);
-            setPlotImage(data.plot_image);
+            setPlotImage(new URL(data.plot_url, 'http://127.0.0.1:5000').href);
 
             if (!query && !locations.some((loc) => loc.address === data.location.address)) {
                 setLocations((prevLocations) => [...prevLocations, data.location]);
@@ -157,7 +157,7 @@ const WeatherPrediction: React.FC = () => {
                                     </h3>
                                     <div className="rounded-xl overflow-hidden shadow-2xl border border-blue-500/20">
                                         <img
-                                            src={`data:image/png;base64,${plotImage}`}
+                                            src={plotImage}
                                             alt="Weather Forecast"
                                             className="w-full h-auto"
                                         />
@@ -1,90 +1,10 @@
 import numpy as np
-import cirq
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
-from geopy.geocoders import Nominatim
+from datetime import datetime
+from typing import List, Tuple
 import matplotlib.pyplot as plt
-import random
 import folium
-
-
-class QuantumWeatherPredictor:
-    def __init__(self, location: str, prediction_window: int = 7):
-        self.location = location
-        self.prediction_window = prediction_window
-        self.num_qubits = 3  # Using 3 qubits for demonstration
-
-    def get_historical_weather_data(self) -> List[Tuple[datetime, float]]:
-        """Generate mock historical weather data for the location."""
-        historical_data = []
-        base_date = datetime(2023, 1, 1)
-        for i in range(30):  # 30 days of historical data
-            date = base_date + timedelta(days=i)
-            temperature = random.uniform(-10, 45)  # Temperature range from -10°C to 45°C
-            historical_data.append((date, temperature))
-        return historical_data
-
-    def preprocess_data(self, historical_data: List[Tuple[datetime, float]]) -> List[int]:
-        """Preprocess historical data to create binary input for quantum computing."""
-        binary_data = []
-        for _, temperature in historical_data:
-            norm_temp = (temperature + 10) / 55  # Normalize between -10°C to 45°C
-            binary_value = int(norm_temp * (2**self.num_qubits - 1))  # Map to binary range
-            binary_data.append(bin(binary_value)[2:].zfill(self.num_qubits))
-        return binary_data
-
-    def prepare_quantum_circuit(self, binary_data: List[str]) -> cirq.Circuit:
-        """Prepare a quantum circuit to predict extreme weather events."""
-        qubits = [cirq.NamedQubit(f'q{i}') for i in range(self.num_qubits)]
-        circuit = cirq.Circuit()
-
-        for qubit in qubits:
-            circuit.append(cirq.H(qubit))  # Create superposition
-
-        for i, bitstring in enumerate(binary_data):
-            for j, bit in enumerate(bitstring):
-                if bit == '1':
-                    circuit.append(cirq.X(qubits[j]))
-
-        circuit.append(cirq.measure(*qubits, key='measurement'))
-        return circuit
-
-    def simulate_quantum_circuit(self, circuit: cirq.Circuit) -> Dict[str, int]:
-        """Simulate the quantum circuit and return the results."""
-        simulator = cirq.Simulator()
-        result = simulator.run(circuit, repetitions=1000)
-        measurement_results = result.measurements['measurement']
-
-        bitstrings = [
-            ''.join(map(str, measurement[::-1]))  # Reverse order for little-endian
-            for measurement in measurement_results
-        ]
-
-        counts = {}
-        for bitstring in bitstrings:
-            counts[bitstring] = counts.get(bitstring, 0) + 1
-
-        return counts
-
-    def analyze_quantum_results(self, counts: Dict[str, int]) -> float:
-        """Analyze quantum measurement results."""
-        total_shots = sum(counts.values())
-        weighted_score = 0
-
-        for bitstring, count in counts.items():
-            prob = count / total_shots
-            numeric_value = int(bitstring, 2) / (2**self.num_qubits - 1)
-            weighted_score += prob * numeric_value
-
-        return weighted_score
-
-    def predict_extreme_weather(self, historical_data: List[Tuple[datetime, float]]) -> float:
-        """Predict extreme weather events using quantum algorithms."""
-        binary_data = self.preprocess_data(historical_data)
-        circuit = self.prepare_quantum_circuit(binary_data)
-        counts = self.simulate_quantum_circuit(circuit)
-        prediction_score = self.analyze_quantum_results(counts)
-        return prediction_score
+from geocoding import get_default_geocoder
+from quantum_predictor import QuantumWeatherPredictor
 
 
 class WeatherVisualizer:
@@ -108,18 +28,17 @@ class WeatherVisualizer:
 
     def create_location_map(self, location: str):
         """Display location on an interactive map."""
-        geolocator = Nominatim(user_agent="weather_predictor")
-        location_info = geolocator.geocode(location)
+        location_info = get_default_geocoder().geocode(location)
 
         if location_info:
-            print(f"Location: {location_info.address}")
-            print(f"Latitude: {location_info.latitude}, Longitude: {location_info.longitude}")
+            print(f"Location: {location_info['address']}")
+            print(f"Latitude: {location_info['lat']}, Longitude: {location_info['lon']}")
 
             # Create an interactive map
-            weather_map = folium.Map(location=[location_info.latitude, location_info.longitude], zoom_start=10)
+            weather_map = folium.Map(location=[location_info['lat'], location_info['lon']], zoom_start=10)
             folium.Marker(
-                location=[location_info.latitude, location_info.longitude],
-                popup=f"{location_info.address}",
+                location=[location_info['lat'], location_info['lon']],
+                popup=f"{location_info['address']}",
                 icon=folium.Icon(color="blue", icon="info-sign"),
             ).add_to(weather_map)
 
@@ -1,103 +1,82 @@
-from flask import Flask, jsonify, request
+import os
+from flask import Blueprint, Flask, jsonify, request
 from flask_cors import CORS
-from datetime import datetime, timedelta
-import random
-import numpy as np
-import cirq
-from geopy.geocoders import Nominatim
-import matplotlib.pyplot as plt
-import io
-import base64
+from quantum_predictor import (QuantumWeatherPredictor, historical_temperatures_batch,
+                               predict_extreme_weather_batch)
+from instrumentation import cache_collector, instrument_app, registry, stage
+from rolling_series import default_series_store
+from score_cache import ScoreCache, predict_with_cache
 
-app = Flask(__name__)
-CORS(app)  # Allow CORS for all domains (optional)
-
-class QuantumWeatherPredictor:
-    def __init__(self, location: str, prediction_window: int = 7):
-        self.location = location
-        self.prediction_window = prediction_window
-        self.num_qubits = 3  # Using 3 qubits for demonstration
-
-    def get_historical_weather_data(self):
-        historical_data = []
-        base_date = datetime(2023, 1, 1)
-        for i in range(30):  # 30 days of historical data
-            date = base_date + timedelta(days=i)
-            temperature = random.uniform(-10, 45)  # Temperature range from -10°C to 45°C
-            historical_data.append((date, temperature))
-        return historical_data
-
-    def preprocess_data(self, historical_data):
-        binary_data = []
-        for _, temperature in historical_data:
-            norm_temp = (temperature + 10) / 55  # Normalize between -10°C to 45°C
-            binary_value = int(norm_temp * (2**self.num_qubits - 1))  # Map to binary range
-            binary_data.append(bin(binary_value)[2:].zfill(self.num_qubits))
-        return binary_data
-
-    def prepare_quantum_circuit(self, binary_data):
-        qubits = [cirq.NamedQubit(f'q{i}') for i in range(self.num_qubits)]
-        circuit = cirq.Circuit()
-
-        for qubit in qubits:
-            circuit.append(cirq.H(qubit))  # Create superposition
-
-        for i, bitstring in enumerate(binary_data):
-            for j, bit in enumerate(bitstring):
-                if bit == '1':
-                    circuit.append(cirq.X(qubits[j]))
-
-        circuit.append(cirq.measure(*qubits, key='measurement'))
-        return circuit
+MAX_BATCH_LOCATIONS = 10000
 
-    def simulate_quantum_circuit(self, circuit):
-        simulator = cirq.Simulator()
-        result = simulator.run(circuit, repetitions=1000)
-        measurement_results = result.measurements['measurement']
+bp = Blueprint("extreme", __name__)
 
-        bitstrings = [
-            ''.join(map(str, measurement[::-1]))  # Reverse order for little-endian
-            for measurement in measurement_results
-        ]
+# Scores per distinct circuit; WEATHER_SCORE_CACHE shares them between worker processes
+score_cache = ScoreCache(maxsize=int(os.environ.get("WEATHER_SCORE_CACHE_SIZE", "1024")),
+                         path=os.environ.get("WEATHER_SCORE_CACHE") or None)
+registry.register_collector("extreme_scores", cache_collector("extreme_scores", score_cache.stats))
+registry.register_collector("rolling_series", cache_collector("rolling_series", default_series_store.stats))
 
-        counts = {}
-        for bitstring in bitstrings:
-            counts[bitstring] = counts.get(bitstring, 0) + 1
-
-        return counts
-
-    def analyze_quantum_results(self, counts):
-        total_shots = sum(counts.values())
-        weighted_score = 0
-
-        for bitstring, count in counts.items():
-            prob = count / total_shots
-            numeric_value = int(bitstring, 2) / (2**self.num_qubits - 1)
-            weighted_score += prob * numeric_value
-
-        return weighted_score
-
-    def predict_extreme_weather(self, historical_data):
-        binary_data = self.preprocess_data(historical_data)
-        circuit = self.prepare_quantum_circuit(binary_data)
-        counts = self.simulate_quantum_circuit(circuit)
-        prediction_score = self.analyze_quantum_results(counts)
-        return prediction_score
-
-@app.route('/predict', methods=['POST'])
+@bp.route('/predict', methods=['POST'])
 def predict():
     data = request.get_json()
     location = data['location']
+    mode = data.get('mode', 'sampled')
+    if mode not in ('sampled', 'exact'):
+        return jsonify({'error': "'mode' must be 'sampled' or 'exact'"}), 400
 
     # Initialize Quantum Weather Predictor
     predictor = QuantumWeatherPredictor(location=location)
-    historical_data = predictor.get_historical_weather_data()
+    with stage("extreme", "history"):
+        historical_data = predictor.get_rolling_historical_series()
 
     # Predict extreme weather events
-    prediction = predictor.predict_extreme_weather(historical_data)
+    with stage("extreme", "predict"):
+        prediction = predict_with_cache(predictor, score_cache, historical_data, mode=mode)
 
     # Return prediction as a response
     return jsonify({'prediction': prediction})
 
+@bp.route('/predict/stats', methods=['GET'])
+def predict_stats():
+    return jsonify(score_cache.stats())
+
+@bp.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    data = request.get_json(silent=True) or {}
+    locations = data.get('locations')
+    mode = data.get('mode', 'exact')
+    if not isinstance(locations, list) or not locations:
+        return jsonify({'error': "'locations' must be a non-empty list"}), 400
+    if len(locations) > MAX_BATCH_LOCATIONS:
+        return jsonify({'error': f"At most {MAX_BATCH_LOCATIONS} locations per batch"}), 400
+    if mode not in ('sampled', 'exact'):
+        return jsonify({'error': "'mode' must be 'sampled' or 'exact'"}), 400
+
+    # Validate each entry independently so one bad location does not fail the batch
+    valid, errors = [], []
+    for index, location in enumerate(locations):
+        if isinstance(location, str) and location.strip():
+            valid.append((index, location))
+        else:
+            errors.append({'index': index, 'location': location, 'error': 'Invalid location'})
+
+    results = []
+    if valid:
+        with stage("extreme", "batch_history"):
+            histories = historical_temperatures_batch([location for _, location in valid])
+        with stage("extreme", "batch_predict"):
+            predictions = predict_extreme_weather_batch(histories, mode=mode)
+        results = [{'index': index, 'location': location, 'prediction': float(prediction)}
+                   for (index, location), prediction in zip(valid, predictions)]
+
+    return jsonify({'results': results, 'errors': errors})
+
+# Standalone service; service.create_app mounts the blueprint alongside the others
+app = Flask(__name__)
+CORS(app)  # Allow CORS for all domains (optional)
+app.register_blueprint(bp)
+instrument_app(app, "extreme")
+
 if __name__ == '__main__':
     app.run(debug=True,port=5003)
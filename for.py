@@ -1,44 +1,127 @@
-from flask import Flask, request, jsonify, send_file
-import matplotlib.pyplot as plt
-import io
+import hashlib
+import os
+from flask import Blueprint, Flask, Response, request, jsonify
 from flask_cors import CORS
 
-app = Flask(__name__)
-CORS(app)  # Enable cross-origin requests for local React frontend
+from caching import MISSING, LRUCache
+from for2 import HEATMAP_KINDS, LocationManager, render_weather_heatmaps  # Replace with actual file name
+from geocoding import normalize_query
+from instrumentation import cache_collector, instrument_app, registry, stage
+from singleflight import FlightTimeout, SingleFlight
+
+MAX_SAMPLES = 5000
+HEATMAP_MAX_AGE = 86400  # Images are a pure function of the request, so clients may keep them a day
 
-from for2 import LocationManager, visualize_weather_attributes  # Replace with actual file name
+bp = Blueprint("visualization", __name__)
 
 location_manager = LocationManager()
 
-@app.route('/get_weather_visualization', methods=['POST'])
+# Rendered PNGs keyed by their ETag
+heatmap_cache = LRUCache(maxsize=int(os.environ.get("HEATMAP_CACHE_SIZE", "256")))
+
+# Identical concurrent geocodes and renders run once, reused for a short window
+visualization_flight = SingleFlight("visualization",
+                                    reuse_window=float(os.environ.get("VISUALIZATION_COALESCE_WINDOW", "1.0")),
+                                    timeout=float(os.environ.get("VISUALIZATION_COALESCE_TIMEOUT", "60")))
+
+registry.register_collector("geocode", cache_collector("geocode", location_manager.geolocator.stats))
+registry.register_collector("heatmap", cache_collector("heatmap", heatmap_cache.stats))
+
+def _request_data():
+    """Request fields from the query string (GET) or the JSON body (POST).
+
+    On GET, ``kinds`` may be repeated or comma-separated.
+    """
+    if request.method == 'POST':
+        return request.json
+    data = {key: request.args[key] for key in ('city', 'n_samples', 'seed') if key in request.args}
+    kinds = [kind for value in request.args.getlist('kinds') for kind in value.split(',') if kind]
+    if kinds:
+        data['kinds'] = kinds
+    return data
+
+def _parse_options(data):
+    """n_samples, seed and heatmap kinds from the request data; raises ValueError with a client-facing message."""
+    try:
+        n_samples = int(data.get('n_samples', 10))
+        seed = int(data.get('seed', 42))
+    except (TypeError, ValueError):
+        raise ValueError("'n_samples' and 'seed' must be integers")
+    if not 1 <= n_samples <= MAX_SAMPLES or not 0 <= seed < 2**32:
+        raise ValueError(f"'n_samples' must be between 1 and {MAX_SAMPLES} and 'seed' a 32-bit unsigned integer")
+    kinds = data.get('kinds', list(HEATMAP_KINDS))
+    if isinstance(kinds, str):
+        kinds = [kinds]
+    if not isinstance(kinds, list) or not kinds or not set(kinds) <= set(HEATMAP_KINDS):
+        raise ValueError(f"'kinds' must list one or more of {list(HEATMAP_KINDS)}")
+    return n_samples, seed, tuple(dict.fromkeys(kinds))
+
+def _heatmap_etag(latitude, n_samples, seed, kinds):
+    key = f"{latitude!r}|{n_samples}|{seed}|{','.join(kinds)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:32]
+
+@bp.route('/get_weather_visualization/coalesce/stats', methods=['GET'])
+def coalesce_stats():
+    return jsonify(visualization_flight.stats())
+
+@bp.route('/get_weather_visualization', methods=['GET', 'POST'])
 def get_weather_visualization():
     try:
-        data = request.json
+        data = _request_data()
         city_name = data.get('city')
         
         if not city_name:
             return jsonify({"error": "City name is required"}), 400
+        try:
+            n_samples, seed, kinds = _parse_options(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        result = location_manager.get_coordinates(city_name)
+        def geocode():
+            with stage("visualization", "geocode"):
+                return location_manager.get_coordinates(city_name)
+
+        try:
+            result = visualization_flight.do(("geocode", normalize_query(city_name)), geocode)
+        except FlightTimeout:
+            return jsonify({"error": "Server busy, please retry"}), 503
         if not result:
             return jsonify({"error": f"Location '{city_name}' not found"}), 404
-        
         latitude, longitude, address = result
-        print(f"Generating visualization for {address}...")
 
-        # Generate the visualization
-        plt.figure()
-        visualize_weather_attributes(latitude)
-        
-        # Save plot to a BytesIO stream
-        img = io.BytesIO()
-        plt.savefig(img, format='png')
-        img.seek(0)
-        plt.close()
-        
-        return send_file(img, mimetype='image/png')
+        # The image depends only on these, so they key both the client and server caches,
+        # and a revalidating GET is answered before either is consulted
+        etag = _heatmap_etag(latitude, n_samples, seed, kinds)
+        headers = {"ETag": f'"{etag}"', "Cache-Control": f"public, max-age={HEATMAP_MAX_AGE}"}
+        if request.method == 'GET' and etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+
+        def render():
+            png = heatmap_cache.get(etag)
+            if png is MISSING:
+                print(f"Generating visualization for {address}...")
+                with stage("visualization", "render"):
+                    png = render_weather_heatmaps(latitude, n_samples=n_samples, seed=seed, kinds=kinds)
+                heatmap_cache.set(etag, png)
+            return png
+
+        try:
+            png = visualization_flight.do(("render", etag), render)
+        except FlightTimeout:
+            return jsonify({"error": "Server busy, please retry"}), 503
+
+        if request.method == 'POST':
+            # POST responses are not cached by browsers or CDNs; GET carries the caching headers
+            return Response(png, mimetype='image/png')
+        return Response(png, mimetype='image/png', headers=headers)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Standalone service; service.create_app mounts the blueprint alongside the others
+app = Flask(__name__)
+CORS(app)  # Enable cross-origin requests for local React frontend
+app.register_blueprint(bp)
+instrument_app(app, "visualization")
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001)  # Specify port 5001 for the second app
@@ -1,66 +1,151 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
-from sklearn.preprocessing import StandardScaler
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+from geocoding import get_default_geocoder
+from weather_series import WeatherSeries
+
+WEATHER_COLUMNS = ["temperature", "pressure", "humidity", "wind_speed"]
 
 class LocationManager:
     def __init__(self):
-        self.geolocator = Nominatim(user_agent="weather_prediction_system")
+        self.geolocator = get_default_geocoder()
         
     def get_coordinates(self, location_name):
         """
         Get coordinates for any location in the world
         Returns tuple of (latitude, longitude, formatted_address) or None if not found
         """
-        try:
-            location = self.geolocator.geocode(location_name)
-            if location:
-                return (location.latitude, location.longitude, location.address)
-            return None
-        except (GeocoderTimedOut, GeocoderUnavailable):
-            print("Error: Location service timed out. Please try again.")
-            return None
+        location = self.geolocator.geocode(location_name)
+        if location:
+            return (location["lat"], location["lon"], location["address"])
+        return None
+
+HEATMAP_LABELS = ["Temperature (°C)", "Pressure (hPa)", "Humidity (%)", "Wind Speed (km/h)"]
+HEATMAP_KINDS = ("raw", "standardized")
+HEATMAP_TITLES = {"raw": "Weather Parameters Over Time",
+                  "standardized": "Standardized Weather Parameters Over Time"}
+ANNOTATE_MAX_SAMPLES = 50  # Above this, cell labels are unreadable and dominate render time
+
+def draw_heatmap(ax, data, title="Heatmap", xlabel="Weather Parameters", ylabel="Time Steps", annotate=True):
+    """
+    Draw a heatmap on ax: annotated seaborn cells, or a plain imshow for large data
+    """
+    if annotate:
+        import seaborn as sns
+        sns.heatmap(data, ax=ax, annot=True, cmap='coolwarm', fmt='.2f', cbar=True, linewidths=0.5,
+                    xticklabels=HEATMAP_LABELS)
+    else:
+        image = ax.imshow(data, aspect='auto', cmap='coolwarm', interpolation='nearest')
+        ax.figure.colorbar(image, ax=ax)
+        ax.set_xticks(range(len(HEATMAP_LABELS)))
+        ax.set_xticklabels(HEATMAP_LABELS)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
 
 def plot_heatmap(data, title="Heatmap", xlabel="Weather Parameters", ylabel="Time Steps"):
     """
     Generate a heatmap using seaborn and matplotlib
     """
-    plt.figure(figsize=(12, 6))
-    sns.heatmap(data, annot=True, cmap='coolwarm', fmt='.2f', cbar=True, linewidths=0.5,
-                xticklabels=["Temperature (°C)", "Pressure (hPa)", "Humidity (%)", "Wind Speed (km/h)"])
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    draw_heatmap(ax, data, title, xlabel, ylabel)
     plt.show()
 
-def generate_weather_data(n_samples=10, latitude=0):
+def standardize(data):
+    """
+    Zero-mean, unit-variance columns (what sklearn's StandardScaler computes)
+    """
+    std = data.std(axis=0)
+    std[std == 0] = 1
+    return (data - data.mean(axis=0)) / std
+
+def render_weather_heatmaps(latitude, n_samples=10, seed=42, kinds=HEATMAP_KINDS, annotate=None):
+    """
+    Render the requested heatmaps ("raw" and/or "standardized") side by side
+    into one PNG, on a private off-screen figure. annotate defaults to
+    n_samples <= ANNOTATE_MAX_SAMPLES; without it cells are drawn with imshow.
+    """
+    from io import BytesIO
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    if annotate is None:
+        annotate = n_samples <= ANNOTATE_MAX_SAMPLES
+    weather_data = generate_weather_data(n_samples=n_samples, latitude=latitude, seed=seed)
+    panels = {"raw": weather_data, "standardized": standardize(weather_data)}
+
+    fig = Figure(figsize=(12 * len(kinds), 6))
+    FigureCanvasAgg(fig)
+    try:
+        for i, kind in enumerate(kinds):
+            draw_heatmap(fig.add_subplot(1, len(kinds), i + 1), panels[kind], title=HEATMAP_TITLES[kind],
+                         annotate=annotate)
+        fig.tight_layout()
+        buf = BytesIO()
+        fig.savefig(buf, format='png')
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+def generate_weather_data(n_samples=10, latitude=0, seed=42):
     """
     Simulate weather data for n_samples with latitude-based adjustments
     """
-    np.random.seed(42)
+    rng = np.random.RandomState(seed)  # Private stream; same draws as the former np.random.seed(42)
     
     # Adjust temperature based on latitude (rough approximation)
     base_temp = 25 - abs(latitude) * 0.5  # Temperature decreases with distance from equator
     
-    temperature = np.random.normal(base_temp, 5, n_samples)
-    pressure = np.random.normal(1013, 10, n_samples)
+    temperature = rng.normal(base_temp, 5, n_samples)
+    pressure = rng.normal(1013, 10, n_samples)
     
     # Adjust humidity based on latitude (rough approximation)
     base_humidity = 60 - abs(latitude) * 0.3
-    humidity = np.clip(np.random.normal(base_humidity, 10, n_samples), 0, 100)
+    humidity = np.clip(rng.normal(base_humidity, 10, n_samples), 0, 100)
     
-    wind_speed = np.random.normal(15, 5, n_samples)
+    wind_speed = rng.normal(15, 5, n_samples)
     
     weather_data = np.column_stack((temperature, pressure, humidity, wind_speed))
     return weather_data
 
+def generate_weather_ensemble(n_members=500, n_samples=10, latitude=0, seed=42, member_chunk=256):
+    """
+    Draw n_members realizations of generate_weather_data at once as an
+    [n_members, n_samples, 4] array, member_chunk members per vectorized draw
+    """
+    rng = np.random.RandomState(seed)
+    base_temp = 25 - abs(latitude) * 0.5
+    base_humidity = 60 - abs(latitude) * 0.3
+
+    ensemble = np.empty((n_members, n_samples, len(WEATHER_COLUMNS)))
+    for start in range(0, n_members, member_chunk):
+        size = (min(member_chunk, n_members - start), n_samples)
+        members = ensemble[start:start + size[0]]
+        members[..., 0] = rng.normal(base_temp, 5, size)
+        members[..., 1] = rng.normal(1013, 10, size)
+        members[..., 2] = np.clip(rng.normal(base_humidity, 10, size), 0, 100)
+        members[..., 3] = rng.normal(15, 5, size)
+    return ensemble
+
+def ensemble_quantiles(ensemble, quantiles=(0.1, 0.5, 0.9)):
+    """
+    Per-sample quantiles of an ensemble as a [len(quantiles), n_samples, 4] array
+    """
+    return np.quantile(ensemble, quantiles, axis=0)
+
+def generate_weather_series(n_samples=10, latitude=0):
+    """
+    generate_weather_data as a columnar WeatherSeries indexed by time step
+    """
+    return WeatherSeries.from_matrix(generate_weather_data(n_samples, latitude), WEATHER_COLUMNS)
+
 def visualize_weather_attributes(latitude):
     """
     Generate and visualize heatmaps of weather attributes
     """
+    from sklearn.preprocessing import StandardScaler
+
     weather_data = generate_weather_data(n_samples=10, latitude=latitude)
     
     # Original data heatmap
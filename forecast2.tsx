@@ -17,10 +17,9 @@ const CityInput: React.FC = () => {
     }
 
     try {
-      const response = await axios.post(
+      const response = await axios.get(
         'http://127.0.0.1:5001/get_weather_visualization',
-        { city },
-        { responseType: 'blob' }
+        { params: { city }, responseType: 'blob' }
       );
 
       const imageBlob = new Blob([response.data], { type: 'image/png' });
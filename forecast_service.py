@@ -0,0 +1,93 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from image_store import ImageStore, plot_image_store
+from instrumentation import stage
+from jobs import JobError
+from param_store import ParameterStore, train_with_store
+from weather_pred1 import ENSEMBLE_QUANTILES, ensemble_bands, simulate_ensemble
+from weather_series import WeatherSeries
+
+
+class LocationNotFound(Exception):
+    """Raised when a location query has no geocoding match."""
+
+
+def compute_forecast_series(forecaster, parameter_store: ParameterStore, location_query: str,
+                            ensemble: Optional[Dict] = None) -> Tuple[Dict, WeatherSeries, bytes, Optional[Dict]]:
+    """Geocode, simulate, train and plot; returns ``(location, series, PNG bytes, ensemble)``.
+
+    ``ensemble`` holds ``members`` and optional ``quantiles``/``thresholds`` for
+    ``simulate_ensemble`` over the series' time grid; its outer quantiles are
+    drawn as bands.  Without it the fourth element is None.
+    """
+    # Search for locations matching the query
+    with stage("forecast", "geocode"):
+        locations = forecaster.search_locations(location_query)
+    if not locations:
+        raise LocationNotFound(location_query)
+
+    # Use the first found location for simplicity
+    location = locations[0]
+    latitude = location['lat']
+
+    # Bring the location's rolling window up to date; only elapsed slots are simulated.  The window
+    # is a view that the next request for this location may overwrite, and the series outlives this
+    # call (training, plotting, coalesced reuse, serialization), so keep a private copy.
+    with stage("forecast", "generate"):
+        series = forecaster.rolling_weather_series(latitude).copy()
+
+    # Train the quantum model (optional)
+    with stage("forecast", "train"):
+        optimized_params, final_cost = train_with_store(forecaster, parameter_store, latitude,
+                                                        series["temperature"])
+
+    # Draw the ensemble around the same baseline and time grid
+    stats = None
+    if ensemble:
+        with stage("forecast", "ensemble"):
+            quantiles = sorted(ensemble.get("quantiles") or ENSEMBLE_QUANTILES)
+            stats = simulate_ensemble(latitude, series.timestamps, ensemble["members"], np.random.default_rng(),
+                                      quantiles, ensemble.get("thresholds"))
+
+    # Generate the plot image
+    with stage("forecast", "plot"):
+        bands = ensemble_bands(stats, quantiles[0], quantiles[-1]) if stats and len(quantiles) > 1 else None
+        png = forecaster.visualize_forecast_png(series.columns, series.timestamps, location["address"], bands=bands)
+
+    return location, series, png, stats
+
+
+def compute_forecast(forecaster, parameter_store: ParameterStore, image_store: ImageStore,
+                     location_query: str) -> Dict:
+    """Geocode, simulate, train and plot; returns a JSON body linking the plot stored in ``image_store``.
+
+    Used for job results.  The store's directory is shared with the web
+    processes, so the ``plot_url`` resolves through their ``/plots`` route.
+    """
+    location, series, png, _ = compute_forecast_series(forecaster, parameter_store, location_query)
+    return dict(series.to_json_payload(), location=location, plot_url=f"/plots/{image_store.put(png)}.png")
+
+
+_worker_forecaster = None
+_worker_store: Optional[ParameterStore] = None
+_worker_images: Optional[ImageStore] = None
+
+
+def run_forecast_job(location_query: str, n_qubits: int = 4, backend: str = "numpy") -> Dict:
+    """Entry point for worker processes; keeps one forecaster, parameter store and image store per process."""
+    global _worker_forecaster, _worker_store, _worker_images
+    from weather_pred1 import WeatherQuantumForecaster
+
+    if (_worker_forecaster is None or _worker_forecaster.n_qubits != n_qubits
+            or _worker_forecaster.backend.name != backend):
+        _worker_forecaster = WeatherQuantumForecaster(n_qubits=n_qubits, backend=backend)
+    if _worker_store is None:
+        _worker_store = ParameterStore()
+    if _worker_images is None:
+        _worker_images = plot_image_store()
+    try:
+        return compute_forecast(_worker_forecaster, _worker_store, _worker_images, location_query)
+    except LocationNotFound:
+        raise JobError("Location not found", 404) from None
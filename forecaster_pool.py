@@ -0,0 +1,101 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+import numpy as np
+
+from weather_pred1 import WeatherQuantumForecaster
+
+
+class PoolTimeout(Exception):
+    """Raised when no forecaster becomes available within the acquire timeout."""
+
+
+class ForecasterPool:
+    """Bounded, thread-safe pool of long-lived forecasters, one sub-pool per ``n_qubits``.
+
+    Instances are created on demand up to ``size`` per key and then reused;
+    callers beyond that wait for a release.
+    """
+
+    def __init__(self, size: int = 4, factory: Callable[[int], WeatherQuantumForecaster] = None):
+        self.size = size
+        self.factory = factory or (lambda n_qubits: WeatherQuantumForecaster(n_qubits=n_qubits))
+        self._idle: Dict[int, queue.Queue] = {}
+        self._created: Dict[int, int] = {}
+        self._in_use: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def warm_up(self, n_qubits: int = 4, count: Optional[int] = None):
+        """Create ``count`` (default: all) instances and run one simulation on each."""
+        with self._lock:
+            idle = self._idle.setdefault(n_qubits, queue.Queue())
+            missing = min(count or self.size, self.size) - self._created.get(n_qubits, 0)
+            self._created[n_qubits] = self._created.get(n_qubits, 0) + max(missing, 0)
+        for _ in range(max(missing, 0)):
+            forecaster = self.factory(n_qubits)
+            forecaster.simulate_circuit(np.zeros(2 * n_qubits))
+            idle.put(forecaster)
+
+    @contextmanager
+    def acquire(self, n_qubits: int = 4, timeout: Optional[float] = 30) -> Iterator[WeatherQuantumForecaster]:
+        """Borrow a forecaster for the duration of the ``with`` block."""
+        start = time.perf_counter()
+        forecaster = self._checkout(n_qubits, timeout)
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.acquisitions += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            self._in_use[n_qubits] = self._in_use.get(n_qubits, 0) + 1
+        try:
+            yield forecaster
+        finally:
+            with self._lock:
+                self._in_use[n_qubits] -= 1
+            self._idle[n_qubits].put(forecaster)
+
+    def _checkout(self, n_qubits: int, timeout: Optional[float]) -> WeatherQuantumForecaster:
+        with self._lock:
+            idle = self._idle.setdefault(n_qubits, queue.Queue())
+            create = idle.empty() and self._created.get(n_qubits, 0) < self.size
+            if create:
+                self._created[n_qubits] = self._created.get(n_qubits, 0) + 1
+        if create:
+            try:
+                return self.factory(n_qubits)
+            except Exception:
+                with self._lock:
+                    self._created[n_qubits] -= 1
+                raise
+        try:
+            return idle.get(timeout=timeout)
+        except queue.Empty:
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeout(f"No forecaster with n_qubits={n_qubits} available after {timeout}s")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "pools": {
+                    str(n_qubits): {
+                        "created": self._created.get(n_qubits, 0),
+                        "in_use": self._in_use.get(n_qubits, 0),
+                        "idle": idle.qsize(),
+                        "utilization": self._in_use.get(n_qubits, 0) / self.size,
+                    }
+                    for n_qubits, idle in self._idle.items()
+                },
+                "acquisitions": self.acquisitions,
+                "timeouts": self.timeouts,
+                "avg_wait_seconds": self.total_wait / self.acquisitions if self.acquisitions else 0.0,
+                "max_wait_seconds": self.max_wait,
+            }
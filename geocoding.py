@@ -0,0 +1,167 @@
+import csv
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from caching import MISSING, LRUCache, SQLiteStore
+
+MAX_RESULTS = 5
+
+
+def normalize_query(query: str) -> str:
+    """Canonical cache key: case-folded, whitespace collapsed, no spaces around commas."""
+    parts = [re.sub(r"\s+", " ", part).strip() for part in query.casefold().split(",")]
+    return ",".join(part for part in parts if part)
+
+
+class NominatimBackend:
+    """Online lookups through OpenStreetMap Nominatim."""
+
+    name = "nominatim"
+
+    def __init__(self, user_agent: str = "quantum_weather_app", timeout: float = 10):
+        from geopy.geocoders import Nominatim
+        self.geolocator = Nominatim(user_agent=user_agent, timeout=timeout)
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[Dict]:
+        locations = self.geolocator.geocode(query, exactly_one=False, limit=limit) or []
+        return [{"address": loc.address,
+                 "lat": loc.latitude,
+                 "lon": loc.longitude} for loc in locations[:limit]]
+
+
+def read_gazetteer(path: str) -> List[Dict]:
+    """Entries of a gazetteer file: a JSON list of objects or a CSV file with a header row."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        return list(csv.DictReader(f))
+
+
+class GazetteerBackend:
+    """Offline lookups against a local list of places.
+
+    Entries need ``name``, ``lat`` and ``lon`` and may carry a full ``address``;
+    a query matches an entry's normalized name or address.
+    """
+
+    name = "gazetteer"
+
+    def __init__(self, entries: Sequence[Dict]):
+        self._index: Dict[str, List[Dict]] = {}
+        for entry in entries:
+            place = {"address": entry.get("address") or entry["name"],
+                     "lat": float(entry["lat"]),
+                     "lon": float(entry["lon"])}
+            for key in {normalize_query(entry["name"]), normalize_query(place["address"])}:
+                self._index.setdefault(key, []).append(place)
+
+    @classmethod
+    def from_file(cls, path: str) -> "GazetteerBackend":
+        """Load a gazetteer from a JSON list of objects or a CSV file with a header row."""
+        return cls(read_gazetteer(path))
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[Dict]:
+        return list(self._index.get(normalize_query(query), []))[:limit]
+
+
+class Geocoder:
+    """Geocoding through an in-process LRU, a persistent store and a chain of backends.
+
+    Backends are tried in order until one returns results.  Misses are cached
+    for ``negative_ttl`` seconds; backend errors are not cached so a transient
+    outage does not pin a query to "not found".
+    """
+
+    def __init__(self, backends: Sequence, db_path: Optional[str] = None, cache_size: int = 4096,
+                 ttl: float = 30 * 86400, negative_ttl: float = 3600):
+        self.backends = list(backends)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory = LRUCache(maxsize=cache_size)
+        self.store = SQLiteStore(db_path, table="geocode") if db_path else None
+        self.backend_calls = 0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[Dict]:
+        """Return up to ``limit`` matches as dicts with ``address``, ``lat`` and ``lon``."""
+        key = normalize_query(query)
+        if not key:
+            return []
+
+        results = self.memory.get(key)
+        if results is MISSING and self.store is not None:
+            results, expires_at = self.store.get_with_expiry(key)
+            if results is not MISSING:
+                # Keep the stored expiry so promoted misses and hits age out like fresh ones
+                ttl = None if expires_at is None else max(expires_at - time.time(), 0)
+                self.memory.set(key, results, ttl=ttl)
+        if results is MISSING:
+            results = self._lookup(query, key)
+        return [dict(result) for result in results[:limit]]
+
+    def geocode(self, query: str) -> Optional[Dict]:
+        """Return the best match for ``query`` or None."""
+        results = self.search(query, limit=1)
+        return results[0] if results else None
+
+    def _lookup(self, query: str, key: str) -> List[Dict]:
+        failed = False
+        for backend in self.backends:
+            try:
+                with self._lock:
+                    self.backend_calls += 1
+                results = backend.search(query, limit=MAX_RESULTS)
+            except Exception as e:
+                print(f"Error searching locations with {backend.name}: {e}")
+                failed = True
+                continue
+            if results:
+                self._remember(key, results, self.ttl)
+                return results
+        if not failed:
+            self._remember(key, [], self.negative_ttl)
+        return []
+
+    def _remember(self, key: str, results: List[Dict], ttl: float):
+        self.memory.set(key, results, ttl=ttl)
+        if self.store is not None:
+            self.store.set(key, results, ttl=ttl)
+
+    def stats(self) -> Dict:
+        return dict(self.memory.stats(), backend_calls=self.backend_calls)
+
+
+_default_geocoder: Optional[Geocoder] = None
+_default_lock = threading.Lock()
+
+
+def get_default_geocoder() -> Geocoder:
+    """Process-wide geocoder configured from the environment.
+
+    ``WEATHER_GEOCODE_CACHE`` is the SQLite cache path (empty disables it),
+    ``WEATHER_GAZETTEER`` a local gazetteer file consulted before the network,
+    and ``WEATHER_GEOCODE_OFFLINE=1`` drops the Nominatim backend entirely.
+    """
+    global _default_geocoder
+    with _default_lock:
+        if _default_geocoder is None:
+            backends = []
+            gazetteer_path = os.environ.get("WEATHER_GAZETTEER")
+            if gazetteer_path:
+                backends.append(GazetteerBackend.from_file(gazetteer_path))
+            if os.environ.get("WEATHER_GEOCODE_OFFLINE") != "1":
+                backends.append(NominatimBackend())
+            db_path = os.environ.get("WEATHER_GEOCODE_CACHE", "geocode_cache.sqlite3")
+            _default_geocoder = Geocoder(backends, db_path=db_path or None)
+        return _default_geocoder
+
+
+def set_default_geocoder(geocoder: Optional[Geocoder]):
+    """Replace the process-wide geocoder, e.g. with an offline one."""
+    global _default_geocoder
+    with _default_lock:
+        _default_geocoder = geocoder
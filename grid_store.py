@@ -0,0 +1,179 @@
+"""Precomputed regional forecasts in a chunked, memory-mapped on-disk store.
+
+    python grid_store.py build grid/ --lat 35 60 0.25 --lon -10 30 0.25
+    python grid_store.py point grid/ 48.85 2.35
+
+A store is a directory holding ``index.json`` and, per build cycle, a
+subdirectory with one raw float32 file per variable.  Each file is laid out
+as [chunk row, chunk column, cell row, cell column, time], so every chunk of
+cells is contiguous on disk and a query only pages in the chunks it touches.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from weather_series import WeatherSeries, nearest_index
+
+INDEX_FILE = "index.json"
+
+
+def _axis(start: float, stop: float, step: float) -> np.ndarray:
+    return start + step * np.arange(int(round((stop - start) / step)) + 1)
+
+
+class GridStore:
+    """Read access to a store written by ``build``; arrays are opened with ``np.memmap``."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        self.latitudes = _axis(*self.index["lat"])
+        self.longitudes = _axis(*self.index["lon"])
+        step = np.timedelta64(self.index["time"]["step_us"], "us")
+        self.timestamps = np.datetime64(self.index["time"]["start"], "us") + step * np.arange(self.index["time"]["n"])
+        self.chunk = tuple(self.index["chunk"])
+        shape = self.chunk_grid_shape(len(self.latitudes), len(self.longitudes), self.chunk) + self.chunk
+        cycle = os.path.join(path, self.index["cycle"])
+        self.arrays = {name: np.memmap(os.path.join(cycle, f"{name}.f32"), dtype="<f4", mode="r",
+                                       shape=shape + (len(self.timestamps),))
+                       for name in self.index["variables"]}
+
+    @staticmethod
+    def chunk_grid_shape(n_lat: int, n_lon: int, chunk: Tuple[int, int]) -> Tuple[int, int]:
+        return -(-n_lat // chunk[0]), -(-n_lon // chunk[1])
+
+    def _cell(self, axis: np.ndarray, value: float, name: str) -> int:
+        step = axis[1] - axis[0] if len(axis) > 1 else 1.0
+        with np.errstate(over="ignore"):
+            position = (value - axis[0]) / step
+        # Checked before rounding so that NaN and values beyond int range are rejected too
+        if not -0.5 <= position < len(axis) - 0.5:
+            raise ValueError(f"{name} {value} is outside the grid ({axis[0]} .. {axis[-1]})")
+        return int(round(position))
+
+    def point(self, latitude: float, longitude: float, now: Optional[np.datetime64] = None) -> WeatherSeries:
+        """Series of the cell nearest (latitude, longitude), as views into the memory map."""
+        i = self._cell(self.latitudes, latitude, "Latitude")
+        j = self._cell(self.longitudes, longitude, "Longitude")
+        (ci, ii), (cj, jj) = divmod(i, self.chunk[0]), divmod(j, self.chunk[1])
+        now = np.datetime64(datetime.utcnow() if now is None else now, "us")
+        return WeatherSeries(self.timestamps, {name: array[ci, cj, ii, jj] for name, array in self.arrays.items()},
+                             now_index=nearest_index(self.timestamps, now))
+
+    def select(self, lat_min: float, lat_max: float, lon_min: float,
+               lon_max: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Row and column indices of the cells inside the box; reads no data."""
+        lat_sel = np.flatnonzero((self.latitudes >= lat_min) & (self.latitudes <= lat_max))
+        lon_sel = np.flatnonzero((self.longitudes >= lon_min) & (self.longitudes <= lon_max))
+        return lat_sel, lon_sel
+
+    def bbox(self, lat_min: float, lat_max: float, lon_min: float,
+             lon_max: float) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Cells inside the box as ``(latitudes, longitudes, {name: [L, M, T] array})``, read chunk by chunk."""
+        lat_sel, lon_sel = self.select(lat_min, lat_max, lon_min, lon_max)
+        columns = {name: np.empty((len(lat_sel), len(lon_sel), len(self.timestamps)), dtype=np.float32)
+                   for name in self.arrays}
+        if len(lat_sel) and len(lon_sel):
+            for ci in range(lat_sel[0] // self.chunk[0], lat_sel[-1] // self.chunk[0] + 1):
+                rows = lat_sel[(lat_sel // self.chunk[0]) == ci]
+                for cj in range(lon_sel[0] // self.chunk[1], lon_sel[-1] // self.chunk[1] + 1):
+                    cols = lon_sel[(lon_sel // self.chunk[1]) == cj]
+                    out_rows = slice(rows[0] - lat_sel[0], rows[-1] - lat_sel[0] + 1)
+                    out_cols = slice(cols[0] - lon_sel[0], cols[-1] - lon_sel[0] + 1)
+                    in_rows = slice(rows[0] % self.chunk[0], rows[-1] % self.chunk[0] + 1)
+                    in_cols = slice(cols[0] % self.chunk[1], cols[-1] % self.chunk[1] + 1)
+                    for name, array in self.arrays.items():
+                        columns[name][out_rows, out_cols] = array[ci, cj, in_rows, in_cols]
+        return self.latitudes[lat_sel], self.longitudes[lon_sel], columns
+
+
+def build(path: str, lat: Tuple[float, float, float], lon: Tuple[float, float, float],
+          days_past: float = 30, days_future: float = 14, step_hours: float = 4,
+          chunk: Tuple[int, int] = (16, 16), seed: int = 0, now: Optional[np.datetime64] = None) -> GridStore:
+    """Simulate every cell of the (start, stop, step) ``lat`` x ``lon`` grid and write a store to ``path``.
+
+    Chunks are generated one at a time, so memory use is bounded by the chunk
+    size.  Each build writes a new cycle directory and then atomically swaps
+    the index to it, so readers see either the old cycle or the new one.
+    Older cycles are then deleted; readers that still map them keep working.
+    """
+    from weather_pred1 import GRID_NOISE_SCALES, simulate_weather_grid, time_grid
+
+    latitudes, longitudes = _axis(*lat), _axis(*lon)
+    # Epoch-aligned time axis, as in rolling_series, so consecutive cycles share slots
+    past_start, step, n_samples = time_grid(days_past, days_future, step_hours, now)
+    past_start = np.datetime64(0, "us") + ((past_start - np.datetime64(0, "us")) // step) * step
+    timestamps = past_start + step * np.arange(n_samples)
+
+    cycle = f"cycle-{datetime.utcnow():%Y%m%dT%H%M%S}-{os.getpid()}"
+    os.makedirs(os.path.join(path, cycle))
+    chunk_rows, chunk_cols = GridStore.chunk_grid_shape(len(latitudes), len(longitudes), chunk)
+    shape = (chunk_rows, chunk_cols) + tuple(chunk) + (n_samples,)
+    arrays = {name: np.memmap(os.path.join(path, cycle, f"{name}.f32"), dtype="<f4", mode="w+", shape=shape)
+              for name in GRID_NOISE_SCALES}
+    for ci in range(chunk_rows):
+        lat_chunk = latitudes[ci * chunk[0]:(ci + 1) * chunk[0]]
+        for cj in range(chunk_cols):
+            lon_chunk = longitudes[cj * chunk[1]:(cj + 1) * chunk[1]]
+            grid = simulate_weather_grid(lat_chunk, lon_chunk, timestamps, step, seed)
+            for name, values in grid.items():
+                arrays[name][ci, cj, :len(lat_chunk), :len(lon_chunk)] = values
+    for array in arrays.values():
+        array.flush()
+    arrays.clear()
+
+    index = {
+        "cycle": cycle, "lat": list(lat), "lon": list(lon), "chunk": list(chunk), "seed": seed,
+        "time": {"start": str(timestamps[0]), "step_us": int(step / np.timedelta64(1, "us")), "n": n_samples},
+        "variables": list(GRID_NOISE_SCALES),
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    tmp_path = os.path.join(path, f"{INDEX_FILE}.tmp{os.getpid()}")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, INDEX_FILE))
+
+    for entry in os.listdir(path):
+        if entry.startswith("cycle-") and entry != cycle:
+            shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+    return GridStore(path)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Precompute a region")
+    build_parser.add_argument("path")
+    build_parser.add_argument("--lat", nargs=3, type=float, required=True, metavar=("START", "STOP", "STEP"))
+    build_parser.add_argument("--lon", nargs=3, type=float, required=True, metavar=("START", "STOP", "STEP"))
+    build_parser.add_argument("--days-past", type=float, default=30)
+    build_parser.add_argument("--days-future", type=float, default=14)
+    build_parser.add_argument("--step-hours", type=float, default=4)
+    build_parser.add_argument("--chunk", nargs=2, type=int, default=(16, 16))
+    build_parser.add_argument("--seed", type=int, default=0)
+    point_parser = commands.add_parser("point", help="Print the present sample of one location")
+    point_parser.add_argument("path")
+    point_parser.add_argument("lat", type=float)
+    point_parser.add_argument("lon", type=float)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        store = build(args.path, tuple(args.lat), tuple(args.lon), args.days_past, args.days_future,
+                      args.step_hours, tuple(args.chunk), args.seed)
+        print(f"{len(store.latitudes)} x {len(store.longitudes)} cells x {len(store.timestamps)} samples "
+              f"written to {args.path}")
+    else:
+        series = GridStore(args.path).point(args.lat, args.lon).present()
+        print(json.dumps(series.to_json_payload(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
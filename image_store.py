@@ -0,0 +1,108 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+from caching import MISSING, LRUCache
+
+IMAGE_ID = re.compile(r"[0-9a-f]{64}")
+
+
+class ImageStore:
+    """Content-addressed PNG store: a directory of ``<sha256>.png`` files behind an in-process LRU.
+
+    Every worker process on the host reads the same directory, so an id
+    handed out by one worker can be served by any other, and images outlive
+    the LRU.  Files are written atomically and never change; those not
+    published again for ``ttl`` seconds are deleted by a sweep that runs at
+    most once per ``sweep_interval`` seconds.
+    """
+
+    def __init__(self, path: str, maxsize: int = 256, ttl: float = 7 * 86400, sweep_interval: float = 3600):
+        self.path = path
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.memory = LRUCache(maxsize=maxsize)
+        self.disk_hits = 0
+        self.not_found = 0
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def image_id(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _file(self, image_id: str) -> str:
+        return os.path.join(self.path, f"{image_id}.png")
+
+    def put(self, data: bytes) -> str:
+        """Store ``data``; returns its id."""
+        image_id = self.image_id(data)
+        self.memory.set(image_id, data)
+        path = self._file(image_id)
+        try:
+            os.utime(path)  # Already stored; keep it from being swept
+        except FileNotFoundError:
+            tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        self._maybe_sweep()
+        return image_id
+
+    def get(self, image_id: str) -> Optional[bytes]:
+        """The image stored under ``image_id``, or None."""
+        if not IMAGE_ID.fullmatch(image_id):
+            return None
+        data = self.memory.get(image_id)
+        if data is not MISSING:
+            return data
+        try:
+            with open(self._file(image_id), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.not_found += 1
+            return None
+        self.memory.set(image_id, data)
+        with self._lock:
+            self.disk_hits += 1
+        return data
+
+    def sweep(self) -> int:
+        """Delete images not published for ``ttl`` seconds; returns how many were removed."""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for entry in os.scandir(self.path):
+            try:
+                if entry.name.endswith(".png") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass  # Swept by another worker
+        return removed
+
+    def _maybe_sweep(self):
+        with self._lock:
+            due = time.monotonic() - self._last_sweep >= self.sweep_interval
+            if due:
+                self._last_sweep = time.monotonic()
+        if due:
+            self.sweep()
+
+    def stats(self) -> Dict:
+        return dict(self.memory.stats(), disk_hits=self.disk_hits, not_found=self.not_found)
+
+
+def plot_image_store() -> ImageStore:
+    """The forecast plot store configured from ``PLOT_IMAGE_*``.
+
+    Web and job worker processes each build their own, over the same directory.
+    """
+    return ImageStore(os.environ.get("PLOT_IMAGE_DIR") or os.path.join(tempfile.gettempdir(), "weather_plots"),
+                      maxsize=int(os.environ.get("PLOT_IMAGE_CACHE_SIZE", "256")),
+                      ttl=float(os.environ.get("PLOT_IMAGE_TTL", str(7 * 86400))))
@@ -0,0 +1,247 @@
+"""Lightweight latency and counter metrics with Prometheus text exposition.
+
+Set ``WEATHER_METRICS=0`` to disable recording entirely (``stage`` then
+returns a shared no-op context manager) and ``WEATHER_SERVER_TIMING=1`` to
+add a ``Server-Timing`` header with the stages of each request.
+"""
+import bisect
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+ENABLED = os.environ.get("WEATHER_METRICS", "1") != "0"
+SERVER_TIMING = ENABLED and os.environ.get("WEATHER_SERVER_TIMING") == "1"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def samples(self, name: str, labels: Labels) -> Iterable[str]:
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            le_label = f'le="{le}"'
+            yield f"{name}_bucket{_format_labels(labels, le_label)} {cumulative}"
+        yield f"{name}_sum{_format_labels(labels)} {total}"
+        yield f"{name}_count{_format_labels(labels)} {count}"
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name: str, labels: Labels) -> Iterable[str]:
+        yield f"{name}{_format_labels(labels)} {self.value}"
+
+
+class Gauge(Counter):
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+
+class Registry:
+    """Metric families keyed by name, each holding one child per label set."""
+
+    def __init__(self):
+        self._families: Dict[str, Tuple[str, str, Dict[Labels, object]]] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, kind: str, factory: Callable, name: str, help_text: str, labels: Dict[str, str]):
+        key = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is None or key not in family[2]:
+            with self._lock:
+                family = self._families.setdefault(name, (kind, help_text, {}))
+                family[2].setdefault(key, factory())
+        return family[2][key]
+
+    def histogram(self, name: str, help_text: str, **labels) -> Histogram:
+        return self._child("histogram", Histogram, name, help_text, labels)
+
+    def counter(self, name: str, help_text: str, **labels) -> Counter:
+        return self._child("counter", Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str, **labels) -> Gauge:
+        return self._child("gauge", Gauge, name, help_text, labels)
+
+    def register_collector(self, key: str, collector: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]):
+        """Add a callable evaluated at scrape time yielding ``(name, type, help, labels, value)``.
+
+        Registering the same ``key`` again replaces the earlier collector, so
+        modules sharing an object can both register it without duplicate samples.
+        """
+        self._collectors[key] = collector
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            families = [(name, kind, help_text, list(children.items()))
+                        for name, (kind, help_text, children) in sorted(self._families.items())]
+        for name, kind, help_text, children in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in children:
+                lines.extend(metric.samples(name, labels))
+
+        collected: Dict[str, Tuple[str, str, List[str]]] = {}
+        for collector in list(self._collectors.values()):
+            for name, kind, help_text, labels, value in collector():
+                family = collected.setdefault(name, (kind, help_text, []))
+                family[2].append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value}")
+        for name, (kind, help_text, samples) in sorted(collected.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+_request_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_timings", default=None)
+
+_NULL_STAGE = nullcontext()
+
+
+@contextmanager
+def _timed_stage(service: str, name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        registry.counter("weather_stage_errors_total", "Exceptions raised inside a stage.",
+                         service=service, stage=name).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.histogram("weather_stage_seconds", "Latency of each request stage.",
+                           service=service, stage=name).observe(elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+def stage(service: str, name: str):
+    """Context manager timing one stage of a request; a no-op when metrics are disabled."""
+    if not ENABLED:
+        return _NULL_STAGE
+    return _timed_stage(service, name)
+
+
+def timed(service: str, name: str):
+    """Decorator form of ``stage``."""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _timed_stage(service, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, help_text: str, amount: float = 1, **labels):
+    if ENABLED:
+        registry.counter(name, help_text, **labels).inc(amount)
+
+
+def cache_collector(cache_name: str, stats: Callable[[], Dict]):
+    """Collector exposing hits, misses and size from a ``stats()`` dict as gauges."""
+    def collect():
+        current = stats()
+        for key in ("hits", "misses", "size", "hit_rate"):
+            if key in current:
+                yield (f"weather_cache_{key}", "gauge", f"Cache {key.replace('_', ' ')}.",
+                       {"cache": cache_name}, current[key])
+    return collect
+
+
+def instrument_app(app, service: str):
+    """Add in-flight/request metrics, optional Server-Timing and a ``/metrics`` route to a Flask app."""
+    from flask import Response, g, request
+
+    @app.route("/metrics", methods=["GET"], endpoint=f"{service}_metrics")
+    def metrics():
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+    if not ENABLED:
+        return
+
+    in_flight = registry.gauge("weather_requests_in_flight", "Requests currently being handled.", service=service)
+
+    @app.before_request
+    def start_request():
+        if request.endpoint == f"{service}_metrics":
+            return
+        g.weather_request_start = time.perf_counter()
+        g.weather_timings_token = _request_timings.set([])
+        in_flight.inc()
+
+    @app.after_request
+    def finish_request(response):
+        start = g.get("weather_request_start")
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        registry.histogram("weather_request_seconds", "End-to-end request latency.",
+                           service=service, endpoint=request.endpoint or "unknown").observe(elapsed)
+        registry.counter("weather_requests_total", "Requests by endpoint and status code.",
+                         service=service, endpoint=request.endpoint or "unknown",
+                         status=str(response.status_code)).inc()
+        timings = _request_timings.get()
+        if SERVER_TIMING and timings is not None:
+            entries = [f"{name};dur={duration * 1e3:.2f}" for name, duration in timings]
+            entries.append(f"total;dur={elapsed * 1e3:.2f}")
+            response.headers["Server-Timing"] = ", ".join(entries)
+        return response
+
+    @app.teardown_request
+    def end_request(_exc):
+        # Runs even when a view raised, so the in-flight gauge cannot drift
+        if g.pop("weather_request_start", None) is None:
+            return
+        in_flight.dec()
+        _request_timings.reset(g.pop("weather_timings_token"))
@@ -0,0 +1,145 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+
+class QueueFull(Exception):
+    """Raised when the number of unfinished jobs has reached the configured bound."""
+
+
+class JobError(Exception):
+    """Raised by a job for a failure whose message may be shown to clients, with its HTTP status.
+
+    Any other exception is reported only as a generic failure.
+    """
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message, status)
+        self.message = message
+        self.status = status
+
+
+class Job:
+    __slots__ = ("id", "future", "submitted_at", "finished_at", "cancelled")
+
+    def __init__(self, job_id: str, future: Future):
+        self.id = job_id
+        self.future = future
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+
+
+class JobManager:
+    """Runs jobs on a lazily started process pool and tracks them by id.
+
+    At most ``max_pending`` jobs may be unfinished at once; finished jobs are
+    forgotten ``ttl`` seconds after completion.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 64, ttl: float = 600,
+                 start_method: str = "spawn"):
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context(self.start_method))
+        return self._executor
+
+    def submit(self, fn: Callable, *args, **kwargs) -> str:
+        """Queue ``fn(*args, **kwargs)`` and return its job id; raises QueueFull under back-pressure."""
+        with self._lock:
+            self._purge_expired()
+            pending = sum(1 for job in self._jobs.values() if not job.future.done())
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} jobs pending")
+            try:
+                future = self._get_executor().submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                # A worker died; replace the pool rather than failing every later job
+                self._executor = None
+                future = self._get_executor().submit(fn, *args, **kwargs)
+            job = Job(uuid.uuid4().hex, future)
+            self._jobs[job.id] = job
+        job.future.add_done_callback(lambda _: self._finished(job))
+        return job.id
+
+    @staticmethod
+    def _finished(job: Job):
+        job.finished_at = time.time()
+        error = None if job.future.cancelled() else job.future.exception()
+        if error is not None and not isinstance(error, JobError):
+            print(f"Job {job.id} failed: {error!r}")
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Job state, plus ``result`` or ``error`` once finished; None for unknown or expired ids.
+
+        A failed job's ``error`` is the JobError message, with its ``error_status``,
+        or "Job failed" for any other exception.
+        """
+        with self._lock:
+            self._purge_expired()
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+
+        info = {"id": job.id, "submitted_at": job.submitted_at}
+        future = job.future
+        if job.cancelled or future.cancelled():
+            info["status"] = "cancelled"
+        elif not future.done():
+            info["status"] = "running" if future.running() else "queued"
+        elif future.exception() is not None:
+            error = future.exception()
+            info["status"] = "failed"
+            if isinstance(error, JobError):
+                info["error"], info["error_status"] = error.message, error.status
+            else:
+                info["error"], info["error_status"] = "Job failed", 500
+        else:
+            info["status"] = "done"
+            info["result"] = future.result()
+        return info
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job; a job already running keeps its worker but its result is discarded."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.future.done():
+            return False
+        job.cancelled = True
+        job.future.cancel()
+        return True
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": sum(1 for job in jobs if not job.future.done()),
+            "tracked": len(jobs),
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,142 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from caching import MISSING, LRUCache
+from instrumentation import count
+
+
+class ParameterStore:
+    """Trained ansatz parameters keyed by latitude bucket and training-series fingerprint.
+
+    An exact key match means the optimizer can be skipped; otherwise the
+    parameters stored for the nearest latitude serve as a warm start.
+    With ``path`` set, new entries are written out by a background thread at
+    most once per ``save_delay`` seconds, and once more at interpreter exit.
+    """
+
+    def __init__(self, maxsize: int = 1024, lat_bucket_size: float = 1.0, path: Optional[str] = None,
+                 save_delay: float = 5.0):
+        self.lat_bucket_size = lat_bucket_size
+        self.path = path
+        self.save_delay = save_delay
+        self.entries = LRUCache(maxsize=maxsize)
+        self.hits = 0
+        self.warm_starts = 0
+        self.misses = 0
+        self.saves = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        if path:
+            if os.path.exists(path):
+                self.load()
+            atexit.register(self.flush)
+
+    def lat_bucket(self, latitude: float) -> int:
+        return int(np.floor(latitude / self.lat_bucket_size))
+
+    @staticmethod
+    def fingerprint(normalized_series: np.ndarray) -> str:
+        """Stable hash of the series, rounded so float noise does not change it."""
+        quantized = np.round(np.asarray(normalized_series, dtype=np.float64), 3) + 0.0
+        return hashlib.sha1(quantized.tobytes()).hexdigest()[:16]
+
+    def lookup(self, latitude: float, normalized_series: np.ndarray, n_params: int) -> Tuple[Optional[Dict], bool]:
+        """Return ``(entry, exact)``: the exact match, else the nearest-latitude entry, else ``(None, False)``."""
+        bucket = self.lat_bucket(latitude)
+        entry = self.entries.get((n_params, bucket, self.fingerprint(normalized_series)))
+        if entry is not MISSING:
+            with self._lock:
+                self.hits += 1
+            return entry, True
+
+        candidates = [(abs(key[1] - bucket), value) for key, value in self.entries.items() if key[0] == n_params]
+        if not candidates:
+            with self._lock:
+                self.misses += 1
+            return None, False
+        with self._lock:
+            self.warm_starts += 1
+        # items() lists least recently used first, so ties go to the most recent entry
+        return min(reversed(candidates), key=lambda candidate: candidate[0])[1], False
+
+    def store(self, latitude: float, normalized_series: np.ndarray, params: np.ndarray, cost: float,
+              save: bool = True):
+        """Record trained parameters and schedule a write of ``path``.
+
+        ``save=False`` leaves the write to an explicit ``save``/``flush``, for bulk inserts.
+        """
+        key = (len(params), self.lat_bucket(latitude), self.fingerprint(normalized_series))
+        self.entries.set(key, {"params": np.asarray(params, dtype=np.float64).copy(), "cost": float(cost)})
+        if not self.path:
+            return
+        with self._lock:
+            self._dirty = True
+            # A timer inherited across fork is not alive in the child, which then schedules its own
+            if save and (self._save_timer is None or not self._save_timer.is_alive()):
+                self._save_timer = threading.Timer(self.save_delay, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self):
+        """Write ``path`` now if entries changed since the last write."""
+        if self._dirty:
+            self.save()
+
+    def save(self):
+        """Write all entries to ``path`` atomically."""
+        with self._save_lock:
+            with self._lock:
+                self._dirty = False
+                self.saves += 1
+            records = [{"key": list(key), "params": value["params"].tolist(), "cost": value["cost"]}
+                       for key, value in self.entries.items()]
+            tmp_path = f"{self.path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with open(tmp_path, "w") as f:
+                json.dump(records, f)
+            os.replace(tmp_path, self.path)
+
+    def load(self):
+        with open(self.path) as f:
+            records: List[Dict] = json.load(f)
+        for record in records:
+            self.entries.set(tuple(record["key"]), {"params": np.array(record["params"]), "cost": record["cost"]})
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.warm_starts + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "warm_starts": self.warm_starts,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saves": self.saves,
+        }
+
+
+def train_with_store(forecaster, store: ParameterStore, latitude: float,
+                     temperatures: List[float]) -> Tuple[np.ndarray, float]:
+    """Train ``forecaster`` on ``temperatures``, reusing or warm-starting from ``store``."""
+    series = forecaster.normalize_data(temperatures)[:10]
+    n_params = 2 * forecaster.n_qubits
+    entry, exact = store.lookup(latitude, series, n_params)
+    if exact:
+        count("weather_training_total", "Training requests by parameter-store outcome.", outcome="hit")
+        return entry["params"].copy(), entry["cost"]
+    initial_params = entry["params"] if entry is not None else None
+    params, cost, stats = forecaster.train_model(temperatures, initial_params=initial_params, return_stats=True)
+    store.store(latitude, series, params, cost)
+
+    count("weather_training_total", "Training requests by parameter-store outcome.",
+          outcome="warm_start" if entry is not None else "cold_start")
+    count("weather_optimizer_iterations_total", "Optimizer iterations.", stats["iterations"])
+    count("weather_optimizer_evaluations_total", "Optimizer cost evaluations.", stats["evaluations"])
+    count("weather_circuit_evaluations_total", "Circuit evaluations during training.", stats["circuit_evaluations"])
+    return params, cost
@@ -0,0 +1,97 @@
+import base64
+import hashlib
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from caching import MISSING, LRUCache
+from weather_series import nearest_index
+
+COLORS = {"past": "skyblue", "present": "limegreen", "future": "salmon", "band": "gray"}
+
+Bands = Dict[str, Tuple[Sequence[float], Sequence[float]]]
+
+
+class ForecastPlotRenderer:
+    """Renders forecast plots on private Agg figures, so it is safe to call from many threads.
+
+    PNGs are cached by a hash of the series, uncertainty bands, location and
+    "now" index, so an identical request returns the cached bytes without drawing.
+    """
+
+    def __init__(self, cache_size: int = 128):
+        self.cache = LRUCache(maxsize=cache_size)
+
+    def cache_key(self, weather_data: Dict[str, Sequence[float]], timestamps: np.ndarray,
+                  location_name: str, current_idx: int, bands: Optional[Bands] = None) -> str:
+        digest = hashlib.sha1(location_name.encode("utf-8"))
+        digest.update(str(current_idx).encode())
+        digest.update(timestamps.astype("datetime64[us]").view(np.int64).tobytes())
+        for key, values in weather_data.items():
+            digest.update(key.encode("utf-8"))
+            digest.update(np.asarray(values, dtype=np.float64).tobytes())
+        for key, (lower, upper) in (bands or {}).items():
+            digest.update(f"band:{key}".encode("utf-8"))
+            digest.update(np.asarray(lower, dtype=np.float64).tobytes())
+            digest.update(np.asarray(upper, dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def render_png(self, weather_data: Dict[str, Sequence[float]], timestamps: Sequence,
+                   location_name: str, now: Optional[datetime] = None, bands: Optional[Bands] = None) -> bytes:
+        timestamps = np.asarray(timestamps, dtype="datetime64[us]")
+        now = np.datetime64(datetime.utcnow() if now is None else now, "us")
+        current_idx = nearest_index(timestamps, now)
+
+        key = self.cache_key(weather_data, timestamps, location_name, current_idx, bands)
+        png = self.cache.get(key)
+        if png is MISSING:
+            png = self._draw(weather_data, timestamps, location_name, current_idx, bands)
+            self.cache.set(key, png)
+        return png
+
+    def render_base64(self, weather_data: Dict[str, Sequence[float]], timestamps: Sequence,
+                      location_name: str, now: Optional[datetime] = None, bands: Optional[Bands] = None) -> str:
+        return base64.b64encode(self.render_png(weather_data, timestamps, location_name, now, bands)).decode("utf-8")
+
+    def _draw(self, weather_data: Dict[str, Sequence[float]], timestamps: np.ndarray,
+              location_name: str, current_idx: int, bands: Optional[Bands] = None) -> bytes:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.dates import DateFormatter
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(15, 10))
+        FigureCanvasAgg(fig)
+        try:
+            for i, (key, values) in enumerate(weather_data.items()):
+                values = np.asarray(values)
+                ax = fig.add_subplot(len(weather_data), 1, i + 1)
+
+                if bands and key in bands:
+                    lower, upper = bands[key]
+                    ax.fill_between(timestamps, lower, upper, color=COLORS["band"], alpha=0.25,
+                                    linewidth=0, label=f"{key.capitalize()} Ensemble Range")
+
+                ax.plot(timestamps[:current_idx], values[:current_idx], color=COLORS["past"], label=f"Historical {key.capitalize()}", linewidth=2)
+                ax.plot(timestamps[current_idx], values[current_idx], 'o', color=COLORS["present"], label=f"Current {key.capitalize()}", markersize=8)
+                ax.plot(timestamps[current_idx:], values[current_idx:], '--', color=COLORS["future"], label=f"Forecast {key.capitalize()}", linewidth=2)
+
+                ax.set_xlabel("Time")
+                ax.set_ylabel(key.capitalize())
+                ax.set_title(f"{key.capitalize()} Forecast for {location_name}")
+                ax.grid(True, alpha=0.3)
+                ax.legend(loc="upper left")
+                ax.xaxis.set_major_formatter(DateFormatter("%Y-%m-%d %H:%M"))
+                ax.tick_params(axis="x", labelrotation=45)
+
+            fig.tight_layout()
+
+            buf = BytesIO()
+            fig.savefig(buf, format="png")
+            return buf.getvalue()
+        finally:
+            fig.clear()
+
+
+default_renderer = ForecastPlotRenderer()
@@ -0,0 +1,180 @@
+import numpy as np
+from typing import Dict, Tuple, Type, Union
+
+
+class SimulationBackend:
+    """Evaluates the real part of amplitude 0 of the forecaster ansatz.
+
+    The ansatz is an rx layer, a CNOT chain (0 -> 1 -> ... -> n-1) and an ry
+    layer; ``params`` holds the n rx angles followed by the n ry angles.
+    """
+
+    name = "base"
+
+    def __init__(self, n_qubits: int):
+        self.n_qubits = n_qubits
+
+    def evaluate(self, params: np.ndarray) -> Union[float, np.ndarray]:
+        """Evaluate one parameter set (1-D) or a batch of parameter sets (2-D)."""
+        params = np.asarray(params, dtype=np.float64)
+        if params.ndim == 1:
+            return float(self._evaluate_batch(params[np.newaxis, :])[0])
+        if params.ndim != 2:
+            raise ValueError(f"Expected 1-D or 2-D parameters, got shape {params.shape}")
+        return self._evaluate_batch(params)
+
+    def _evaluate_batch(self, params: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class CirqBackend(SimulationBackend):
+    """Reference backend: builds the circuit and runs ``cirq.Simulator``."""
+
+    name = "cirq"
+
+    def __init__(self, n_qubits: int):
+        super().__init__(n_qubits)
+        import cirq
+        self._cirq = cirq
+        self.qubits = [cirq.GridQubit(0, i) for i in range(n_qubits)]
+        self.simulator = cirq.Simulator()
+
+    def create_circuit(self, params: np.ndarray):
+        cirq = self._cirq
+        circuit = cirq.Circuit()
+        for i, qubit in enumerate(self.qubits):
+            circuit.append(cirq.rx(params[i])(qubit))
+        for i in range(len(self.qubits) - 1):
+            circuit.append(cirq.CNOT(self.qubits[i], self.qubits[i + 1]))
+        for i, qubit in enumerate(self.qubits):
+            circuit.append(cirq.ry(params[i + len(self.qubits)])(qubit))
+        return circuit
+
+    def _evaluate_batch(self, params: np.ndarray) -> np.ndarray:
+        out = np.empty(len(params))
+        for k, row in enumerate(params):
+            result = self.simulator.simulate(self.create_circuit(row))
+            out[k] = np.real(result.final_state_vector[0])
+        return out
+
+
+class NumpyBackend(SimulationBackend):
+    """Closed-form evaluation of amplitude 0 with plain array math.
+
+    The CNOT chain maps |b_0 ... b_{n-1}> to the prefix parities of b, so
+    <0| RY . CNOTs . RX |0> is a sum over b of products of single-qubit
+    factors that only depend on (b_i, parity of b_0..b_i).  Carrying the two
+    partial sums for parity 0/1 across the qubits gives an O(n) evaluation,
+    vectorized over the batch axis.
+    """
+
+    name = "numpy"
+
+    def _evaluate_batch(self, params: np.ndarray) -> np.ndarray:
+        n = self.n_qubits
+        if params.shape[1] != 2 * n:
+            raise ValueError(f"Expected {2 * n} parameters, got {params.shape[1]}")
+        half_rx = params[:, :n] / 2
+        half_ry = params[:, n:] / 2
+        # <b| rx(t) |0>: cos(t/2) for b=0, -i sin(t/2) for b=1.
+        rx0 = np.cos(half_rx)
+        rx1 = -1j * np.sin(half_rx)
+        # <0| ry(t) |c>: cos(t/2) for c=0, -sin(t/2) for c=1.
+        ry0 = np.cos(half_ry)
+        ry1 = -np.sin(half_ry)
+
+        even = np.ones(len(params), dtype=np.complex128)
+        odd = np.zeros(len(params), dtype=np.complex128)
+        for i in range(n):
+            even, odd = ((even * rx0[:, i] + odd * rx1[:, i]) * ry0[:, i],
+                         (odd * rx0[:, i] + even * rx1[:, i]) * ry1[:, i])
+        return np.real(even + odd)
+
+
+class StateVectorBackend(SimulationBackend):
+    """Full state-vector simulation of the ansatz in a few BLAS-backed passes.
+
+    The rx layer followed by the CNOT chain maps |0...0> to the state with
+    amplitude prod_i f_i(c_i xor c_{i-1}) at |c> (f_i the rx(theta_i) column,
+    c_{-1} = 0), which is built directly by appending one qubit at a time.
+    The ry layer is a tensor product, so it is applied ``group_size`` qubits
+    at a time as one matrix product with their 2**group_size x 2**group_size
+    Kronecker factor.  Multiplying the transposed state moves the group's
+    axes to the end, so after the last group the qubits are back in order
+    (qubit 0 is the most significant bit, as in cirq).  Each group is a single
+    read and write of the state, so a 22-qubit ry layer takes 6 passes instead
+    of one per qubit.
+
+    The state ping-pongs between two preallocated buffers, so a call
+    allocates nothing beyond the small gate matrices; at 22 qubits a complex128
+    state is 64 MiB per buffer (``dtype=np.complex64``, cirq's default
+    precision, halves that).  The buffers make an instance unsafe to share
+    between threads; ``ForecasterPool`` hands each forecaster to one request at a time.
+    """
+
+    name = "statevector"
+
+    def __init__(self, n_qubits: int, dtype=np.complex128, group_size: int = 4):
+        super().__init__(n_qubits)
+        self.dtype = np.dtype(dtype)
+        self.group_size = group_size
+        self._buffers = (np.empty(2 ** n_qubits, dtype=self.dtype), np.empty(2 ** n_qubits, dtype=self.dtype))
+
+    def _prepare(self, angles: np.ndarray, src: np.ndarray, dst: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Write CNOT-chain . rx(angles) |0...0> into one buffer; returns ``(state, spare)``."""
+        half = angles / 2
+        f0 = np.cos(half).astype(self.dtype)
+        f1 = (-1j * np.sin(half)).astype(self.dtype)
+        src[0], src[1] = f0[0], f1[0]
+        size = 2
+        for i in range(1, self.n_qubits):
+            # New last qubit c: new[j, p, c] = old[j, p] * f_i(c xor p), p being the previous qubit
+            old = src[:size].reshape(-1, 2)
+            new = dst[:2 * size].reshape(-1, 2, 2)
+            factors = ((f0[i], f1[i]), (f1[i], f0[i]))
+            for p in (0, 1):
+                for c in (0, 1):
+                    np.multiply(old[:, p], factors[p][c], out=new[:, p, c])
+            src, dst = dst, src
+            size *= 2
+        return src, dst
+
+    def _ry_group(self, angles: np.ndarray) -> np.ndarray:
+        """Kronecker product of ry(angles), first angle on the most significant qubit."""
+        matrix = np.ones((1, 1))
+        for theta in angles:
+            c, s = np.cos(theta / 2), np.sin(theta / 2)
+            matrix = np.kron(matrix, np.array([[c, -s], [s, c]]))
+        return matrix.astype(self.dtype)
+
+    def final_state(self, params: np.ndarray) -> np.ndarray:
+        """Simulate one parameter set; returns an internal buffer, overwritten by the next call."""
+        n = self.n_qubits
+        if len(params) != 2 * n:
+            raise ValueError(f"Expected {2 * n} parameters, got {len(params)}")
+        state, spare = self._prepare(params[:n], *self._buffers)
+        for start in range(0, n, self.group_size):
+            matrix = self._ry_group(params[n + start:n + min(start + self.group_size, n)])
+            # (group, rest) -> (rest, group): applies the gates and rotates the group's axes to the end
+            np.matmul(state.reshape(len(matrix), -1).T, matrix.T, out=spare.reshape(-1, len(matrix)))
+            state, spare = spare, state
+        return state
+
+    def _evaluate_batch(self, params: np.ndarray) -> np.ndarray:
+        return np.array([self.final_state(row)[0].real for row in params])
+
+
+BACKENDS: Dict[str, Type[SimulationBackend]] = {
+    CirqBackend.name: CirqBackend,
+    NumpyBackend.name: NumpyBackend,
+    StateVectorBackend.name: StateVectorBackend,
+}
+
+
+def get_backend(name: str, n_qubits: int) -> SimulationBackend:
+    """Instantiate the simulation backend registered under ``name``."""
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown simulation backend '{name}'. Available: {sorted(BACKENDS)}")
+    return backend_cls(n_qubits)
@@ -0,0 +1,235 @@
+import hashlib
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+import random
+from rolling_series import RollingSeries, RollingSeriesStore, default_series_store
+from weather_series import WeatherSeries
+
+HistoricalData = Union[List[Tuple[datetime, float]], WeatherSeries]
+
+
+class QuantumWeatherPredictor:
+    def __init__(self, location: str, prediction_window: int = 7):
+        self.location = location
+        self.prediction_window = prediction_window
+        self.num_qubits = 3  # Using 3 qubits for demonstration
+        self._qubits = None
+        self._simulator = None
+
+    @property
+    def qubits(self) -> list:
+        if self._qubits is None:
+            import cirq
+            self._qubits = [cirq.NamedQubit(f'q{i}') for i in range(self.num_qubits)]
+        return self._qubits
+
+    @property
+    def simulator(self) -> "cirq.Simulator":
+        if self._simulator is None:
+            import cirq
+            self._simulator = cirq.Simulator()
+        return self._simulator
+
+    def get_historical_weather_data(self) -> List[Tuple[datetime, float]]:
+        """Generate mock historical weather data for the location."""
+        historical_data = []
+        base_date = datetime(2023, 1, 1)
+        for i in range(30):  # 30 days of historical data
+            date = base_date + timedelta(days=i)
+            temperature = random.uniform(-10, 45)  # Temperature range from -10°C to 45°C
+            historical_data.append((date, temperature))
+        return historical_data
+
+    def get_historical_weather_series(self) -> WeatherSeries:
+        """Mock history as a columnar WeatherSeries with a ``temperature`` column."""
+        timestamps = np.datetime64('2023-01-01', 'us') + np.arange(30) * np.timedelta64(1, 'D')
+        return WeatherSeries(timestamps, {'temperature': mock_daily_temperatures(history_key(self.location),
+                                                                                 timestamps)})
+
+    def get_rolling_historical_series(self, days: int = 30, now: Optional[np.datetime64] = None,
+                                      store: Optional[RollingSeriesStore] = None) -> WeatherSeries:
+        """Daily mock history ending today (``mock_daily_temperatures``), kept per location in ``store``."""
+        key = history_key(self.location)
+
+        def factory():
+            return RollingSeries(lambda timestamps, rng: {'temperature': mock_daily_temperatures(key, timestamps)},
+                                 np.timedelta64(1, 'D'), days - 1, 1)
+
+        store = store or default_series_store
+        return store.window(('history', int(key), days), factory, now)
+
+    def preprocess_data(self, historical_data: HistoricalData) -> List[str]:
+        """Preprocess historical data to create binary input for quantum computing."""
+        if isinstance(historical_data, WeatherSeries):
+            codes = quantize_temperatures(historical_data['temperature'], self.num_qubits)
+            return [format(code, f'0{self.num_qubits}b') for code in codes.tolist()]
+        binary_data = []
+        for _, temperature in historical_data:
+            norm_temp = (temperature + 10) / 55  # Normalize between -10°C to 45°C
+            binary_value = int(norm_temp * (2**self.num_qubits - 1))  # Map to binary range
+            binary_data.append(bin(binary_value)[2:].zfill(self.num_qubits))
+        return binary_data
+
+    def net_parity(self, binary_data: List[str]) -> np.ndarray:
+        """Per-qubit parity of the set bits; consecutive X gates on a qubit cancel in pairs."""
+        parity = np.zeros(self.num_qubits, dtype=np.int64)
+        for bitstring in binary_data:
+            parity ^= np.frombuffer(bitstring.encode('ascii'), dtype=np.uint8) - ord('0')
+        return parity
+
+    def prepare_quantum_circuit(self, binary_data: List[str], simplify: bool = True,
+                                measure: bool = True) -> "cirq.Circuit":
+        """Prepare a quantum circuit to predict extreme weather events.
+
+        With ``simplify`` the X layer is collapsed to one X per qubit of odd
+        parity, so the depth no longer grows with the history length.
+        """
+        import cirq
+
+        qubits = self.qubits
+        circuit = cirq.Circuit()
+
+        for qubit in qubits:
+            circuit.append(cirq.H(qubit))  # Create superposition
+
+        if simplify:
+            circuit.append(cirq.X(qubits[j]) for j in np.flatnonzero(self.net_parity(binary_data)))
+        else:
+            for i, bitstring in enumerate(binary_data):
+                for j, bit in enumerate(bitstring):
+                    if bit == '1':
+                        circuit.append(cirq.X(qubits[j]))
+
+        if measure:
+            circuit.append(cirq.measure(*qubits, key='measurement'))
+        return circuit
+
+    def outcome_values(self, measurements: np.ndarray) -> np.ndarray:
+        """Pack measured bit rows into integers with qubit 0 as the least significant bit."""
+        return measurements.astype(np.int64) @ (1 << np.arange(self.num_qubits))
+
+    def sample_outcome_counts(self, circuit: "cirq.Circuit", repetitions: int = 1000) -> np.ndarray:
+        """Counts of each outcome value 0 .. 2**num_qubits - 1 over ``repetitions`` shots."""
+        result = self.simulator.run(circuit, repetitions=repetitions)
+        values = self.outcome_values(result.measurements['measurement'])
+        return np.bincount(values, minlength=2**self.num_qubits)
+
+    def exact_outcome_probabilities(self, circuit: "cirq.Circuit") -> np.ndarray:
+        """Exact probability of each outcome value, from the final state of an unmeasured circuit."""
+        state = self.simulator.simulate(circuit, qubit_order=self.qubits).final_state_vector
+        probabilities = np.abs(state)**2
+        # State index bits are big-endian in qubit order; outcome values are little-endian
+        indices = np.arange(2**self.num_qubits)
+        bits = (indices[:, np.newaxis] >> (self.num_qubits - 1 - np.arange(self.num_qubits))) & 1
+        return np.bincount(self.outcome_values(bits), weights=probabilities, minlength=len(indices))
+
+    def simulate_quantum_circuit(self, circuit: "cirq.Circuit", repetitions: int = 1000) -> Dict[str, int]:
+        """Simulate the quantum circuit and return the results."""
+        counts = self.sample_outcome_counts(circuit, repetitions)
+        return {format(value, f'0{self.num_qubits}b'): int(count)
+                for value, count in enumerate(counts) if count}
+
+    def score_distribution(self, distribution: np.ndarray) -> float:
+        """Expected normalized outcome value under counts or probabilities indexed by value."""
+        values = np.arange(len(distribution)) / (2**self.num_qubits - 1)
+        return float(distribution @ values / distribution.sum())
+
+    def analyze_quantum_results(self, counts: Dict[str, int]) -> float:
+        """Analyze quantum measurement results."""
+        distribution = np.zeros(2**self.num_qubits)
+        for bitstring, count in counts.items():
+            distribution[int(bitstring, 2)] += count
+        return self.score_distribution(distribution)
+
+    def predict_extreme_weather(self, historical_data: HistoricalData, mode: str = "sampled",
+                                repetitions: int = 1000) -> float:
+        """Predict extreme weather events using quantum algorithms.
+
+        ``mode`` is "sampled" (``repetitions`` measurement shots) or "exact"
+        (expected score from the final state, without shot noise).
+        """
+        return self.predict_from_binary(self.preprocess_data(historical_data), mode, repetitions)
+
+    def predict_from_binary(self, binary_data: List[str], mode: str = "sampled", repetitions: int = 1000) -> float:
+        """``predict_extreme_weather`` for already preprocessed ``binary_data``."""
+        if mode == "exact":
+            circuit = self.prepare_quantum_circuit(binary_data, measure=False)
+            return self.score_distribution(self.exact_outcome_probabilities(circuit))
+        if mode == "sampled":
+            circuit = self.prepare_quantum_circuit(binary_data)
+            return self.score_distribution(self.sample_outcome_counts(circuit, repetitions))
+        raise ValueError(f"Unknown prediction mode '{mode}'")
+
+
+def quantize_temperatures(temperatures: np.ndarray, num_qubits: int = 3) -> np.ndarray:
+    """Vectorized ``preprocess_data``: integer codes of normalized temperatures."""
+    norm_temp = (np.asarray(temperatures, dtype=np.float64) + 10) / 55  # Normalize between -10°C to 45°C
+    return np.trunc(norm_temp * (2**num_qubits - 1)).astype(np.int64)
+
+
+def batch_outcome_probabilities(codes: np.ndarray, num_qubits: int = 3) -> np.ndarray:
+    """Outcome-value probabilities for each history row of quantized ``codes``, shape [L, 2**num_qubits].
+
+    Simulates the simplified circuit (H layer, net-parity X layer) for all
+    rows at once on a [L, 2, ..., 2] state array.
+    """
+    parity_codes = np.bitwise_xor.reduce(codes, axis=1)
+    # Bitstring position j is qubit j, most significant bit first
+    flips = (parity_codes[:, np.newaxis] >> (num_qubits - 1 - np.arange(num_qubits))) & 1
+
+    state = np.full((len(codes),) + (2,) * num_qubits, 2 ** (-num_qubits / 2))
+    for j in range(num_qubits):
+        mask = flips[:, j].astype(bool).reshape((-1,) + (1,) * num_qubits)
+        state = np.where(mask, np.flip(state, axis=j + 1), state)
+    probabilities = np.abs(state.reshape(len(codes), -1))**2
+
+    indices = np.arange(2**num_qubits)
+    bits = (indices[:, np.newaxis] >> (num_qubits - 1 - np.arange(num_qubits))) & 1
+    values = bits @ (1 << np.arange(num_qubits))
+    by_value = np.empty_like(probabilities)
+    by_value[:, values] = probabilities
+    return by_value
+
+
+def predict_extreme_weather_batch(temperatures: np.ndarray, num_qubits: int = 3, mode: str = "exact",
+                                  repetitions: int = 1000, rng: np.random.Generator = None,
+                                  chunk_size: int = 4096) -> np.ndarray:
+    """Scores for each row of a [L, T] temperature array, evaluated in chunks of ``chunk_size`` rows."""
+    if mode not in ("exact", "sampled"):
+        raise ValueError(f"Unknown prediction mode '{mode}'")
+    rng = rng or np.random.default_rng()
+    values = np.arange(2**num_qubits) / (2**num_qubits - 1)
+    scores = np.empty(len(temperatures))
+    for start in range(0, len(temperatures), chunk_size):
+        codes = quantize_temperatures(temperatures[start:start + chunk_size], num_qubits)
+        probabilities = batch_outcome_probabilities(codes, num_qubits)
+        if mode == "sampled":
+            probabilities = rng.multinomial(repetitions, probabilities) / repetitions
+        scores[start:start + chunk_size] = probabilities @ values
+    return scores
+
+
+def history_key(location: str) -> np.uint64:
+    """Stable 64-bit key of a location name, ignoring case and spacing."""
+    from geocoding import normalize_query
+    digest = hashlib.blake2b(normalize_query(location).encode('utf-8'), digest_size=8).digest()
+    return np.uint64(int.from_bytes(digest, 'little'))
+
+
+def mock_daily_temperatures(keys: np.ndarray, timestamps: np.ndarray) -> np.ndarray:
+    """Mock temperatures in [-10, 45) °C, a pure function of the location key and the day.
+
+    Broadcasts ``keys[..., None]`` against ``timestamps``; float32, as stored by ``RollingSeries``.
+    """
+    from weather_pred1 import counter_uniform
+    days = (np.asarray(timestamps, dtype='datetime64[D]') - np.datetime64(0, 'D')).astype(np.int64)
+    return (-10 + 55 * counter_uniform(keys, days)).astype(np.float32)
+
+
+def historical_temperatures_batch(locations: List[str], days: int = 30,
+                                  now: Optional[np.datetime64] = None) -> np.ndarray:
+    """The ``get_rolling_historical_series`` temperatures of each location as one [L, days] array."""
+    today = np.datetime64(datetime.utcnow() if now is None else now, 'D')
+    timestamps = today - np.arange(days - 1, -1, -1)
+    return mock_daily_temperatures(np.array([history_key(location) for location in locations]), timestamps)
@@ -0,0 +1,121 @@
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+from caching import MISSING, LRUCache
+from weather_series import WeatherSeries, nearest_index
+
+Generator = Callable[[np.ndarray, np.random.Generator], Dict[str, np.ndarray]]
+
+
+class RollingSeries:
+    """Sliding window of ``past_slots + future_slots`` samples on a fixed time grid.
+
+    Slot ``s`` covers ``s * step`` since the Unix epoch and is stored at
+    position ``s % capacity`` of a doubled ring buffer (written at both ``p`` and
+    ``p + capacity``), so the current window is always one contiguous slice and
+    ``window`` returns views without copying.  When time moves on, only the
+    slots that entered the window are generated; they overwrite the evicted ones.
+
+    Views stay valid until the window next advances (at most once per ``step``);
+    hold on to one longer than that and copy it first.
+    """
+
+    def __init__(self, generate: Generator, step: np.timedelta64, past_slots: int, future_slots: int,
+                 seed: Optional[int] = None):
+        self.generate = generate
+        self.step = np.timedelta64(step, "us")
+        self.past_slots = past_slots
+        self.capacity = past_slots + future_slots
+        self.rng = np.random.default_rng(seed)
+        self._timestamps = np.empty(2 * self.capacity, dtype="datetime64[us]")
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+        self._first_slot: Optional[int] = None
+        self._lock = threading.Lock()
+        self.slots_generated = 0
+
+    def _write(self, start_slot: int, stop_slot: int):
+        slots = np.arange(start_slot, stop_slot)
+        timestamps = np.datetime64(0, "us") + slots * self.step
+        values = self.generate(timestamps, self.rng)
+        if self._columns is None:
+            self._columns = {name: np.empty(2 * self.capacity, dtype=np.float32) for name in values}
+        positions = slots % self.capacity
+        for buf, data in [(self._timestamps, timestamps)] + [(self._columns[name], values[name]) for name in values]:
+            buf[positions] = data
+            buf[positions + self.capacity] = data
+        self.slots_generated += len(slots)
+
+    def refresh(self, now: Optional[np.datetime64] = None) -> int:
+        """Bring the window up to ``now``; returns the number of slots generated."""
+        now = np.datetime64(datetime.utcnow() if now is None else now, "us")
+        first = int((now - np.datetime64(0, "us")) // self.step) - self.past_slots
+        with self._lock:
+            previous = self._first_slot
+            if previous is not None and first == previous:
+                return 0
+            if previous is None or first < previous or first - previous >= self.capacity:
+                start = first  # Nothing reusable: fill the whole window
+            else:
+                start = previous + self.capacity  # Only the slots past the old window's end
+            self._write(start, first + self.capacity)
+            self._first_slot = first
+            return first + self.capacity - start
+
+    def window(self, now: Optional[np.datetime64] = None) -> WeatherSeries:
+        """Zero-copy WeatherSeries of the current window; ``now_index`` marks the slot nearest ``now``."""
+        now = np.datetime64(datetime.utcnow() if now is None else now, "us")
+        self.refresh(now)
+        with self._lock:
+            head = self._first_slot % self.capacity
+            window = slice(head, head + self.capacity)
+            series = WeatherSeries.__new__(WeatherSeries)
+            series.timestamps = self._timestamps[window]
+            series.columns = {name: values[window] for name, values in self._columns.items()}
+        series.now_index = nearest_index(series.timestamps, now)
+        return series
+
+
+class RollingSeriesStore:
+    """Bounded map from a caller-chosen key (location and window shape) to its RollingSeries."""
+
+    def __init__(self, maxsize: int = 256):
+        self.series = LRUCache(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def window(self, key: Hashable, factory: Callable[[], RollingSeries],
+               now: Optional[np.datetime64] = None) -> WeatherSeries:
+        """Current window for ``key``, creating the RollingSeries with ``factory`` on first use.
+
+        A hit means the window was served without generating any samples.
+        """
+        now = np.datetime64(datetime.utcnow() if now is None else now, "us")
+        with self._lock:
+            rolling = self.series.get(key)
+            if rolling is MISSING:
+                rolling = factory()
+                self.series.set(key, rolling)
+        generated = rolling.refresh(now)
+        with self._lock:
+            if generated:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return rolling.window(now)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.series),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "slots_generated": sum(rolling.slots_generated for _, rolling in self.series.items()),
+        }
+
+
+default_series_store = RollingSeriesStore()
@@ -0,0 +1,80 @@
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from caching import MISSING, LRUCache, SQLiteStore
+from instrumentation import count
+
+
+class ScoreCache:
+    """Extreme-weather scores keyed by the circuit a quantized history produces.
+
+    ``prepare_quantum_circuit`` only depends on the per-qubit parity of the
+    quantized history, so every history with the same parity, ``num_qubits``,
+    mode and repetition count shares one entry; with 3 qubits there are just
+    8 circuits per mode.  Entries live in a bounded LRU and, when ``path`` is
+    set, in a SQLite table that other worker processes read as well.
+    """
+
+    def __init__(self, maxsize: int = 1024, path: Optional[str] = None):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.store = SQLiteStore(path, table="extreme_scores") if path else None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(parity: np.ndarray, num_qubits: int, mode: str, repetitions: int) -> str:
+        parity_code = int(np.asarray(parity, dtype=np.int64) @ (1 << np.arange(len(parity))))
+        # Shot count only changes sampled scores
+        shots = repetitions if mode == "sampled" else 0
+        return f"{num_qubits}:{mode}:{shots}:{parity_code}"
+
+    def get(self, key: str) -> Optional[float]:
+        score = self.memory.get(key)
+        if score is not MISSING:
+            with self._lock:
+                self.hits += 1
+            return score
+        if self.store is not None:
+            score = self.store.get(key)
+            if score is not MISSING:
+                self.memory.set(key, score)
+                with self._lock:
+                    self.shared_hits += 1
+                return score
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, score: float):
+        self.memory.set(key, score)
+        if self.store is not None:
+            self.store.set(key, score)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "size": len(self.memory),
+            "maxsize": self.memory.maxsize,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+        }
+
+
+def predict_with_cache(predictor, cache: ScoreCache, historical_data, mode: str = "sampled",
+                       repetitions: int = 1000) -> float:
+    """``predictor.predict_extreme_weather``, memoized in ``cache``."""
+    binary_data = predictor.preprocess_data(historical_data)
+    key = cache.fingerprint(predictor.net_parity(binary_data), predictor.num_qubits, mode, repetitions)
+    score = cache.get(key)
+    count("weather_prediction_cache_total", "Extreme-weather predictions by score-cache outcome.",
+          outcome="miss" if score is None else "hit")
+    if score is None:
+        score = predictor.predict_from_binary(binary_data, mode, repetitions)
+        cache.set(key, score)
+    return score
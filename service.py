@@ -0,0 +1,59 @@
+"""Single WSGI application serving /forecast, /get_weather_visualization and /predict.
+
+    gunicorn --preload -w 4 service:app      # WEATHER_PRELOAD=1 warms up before forking
+    python service.py                        # development server on port 5000
+
+The blueprints import only flask, numpy, geopy and local helpers; cirq,
+scipy, matplotlib, seaborn and scikit-learn are imported the first time a
+route needs them.  ``warm_up`` imports them up front instead, so a
+preloading server loads them once in the master and its forked workers
+share those pages copy-on-write.
+"""
+import importlib
+import os
+
+from flask import Flask
+from flask_cors import CORS
+
+from instrumentation import instrument_app
+
+BLUEPRINT_MODULES = ("app", "for", "extrem2")  # "for" is a keyword, hence import_module
+
+
+def warm_up():
+    """Import the heavy dependencies and exercise their first-use paths."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import cirq  # noqa: F401
+    import matplotlib.pyplot  # noqa: F401
+    import scipy.optimize  # noqa: F401
+    import seaborn  # noqa: F401
+    import sklearn.preprocessing  # noqa: F401
+    from io import BytesIO
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # Rendering once loads the font cache and Agg text machinery
+    fig = Figure(figsize=(1, 1))
+    FigureCanvasAgg(fig)
+    fig.add_subplot().set_title("warm-up")
+    fig.savefig(BytesIO(), format="png")
+    fig.clear()
+
+
+def create_app(preload: bool = False) -> Flask:
+    """Build the combined application; ``preload`` runs ``warm_up`` before returning."""
+    app = Flask(__name__)
+    CORS(app)  # Enable cross-origin requests for the React frontend
+    for module_name in BLUEPRINT_MODULES:
+        app.register_blueprint(importlib.import_module(module_name).bp)
+    instrument_app(app, "weather")
+    if preload:
+        warm_up()
+    return app
+
+
+app = create_app(preload=os.environ.get("WEATHER_PRELOAD") == "1")
+
+if __name__ == "__main__":
+    app.run(debug=True, port=int(os.environ.get("PORT", "5000")))
@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
+
+from caching import MISSING, LRUCache
+from instrumentation import count
+
+
+class FlightTimeout(Exception):
+    """Raised when a coalesced caller gives up waiting for the in-flight computation."""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it runs wait and receive its result.  Results are reused for
+    ``reuse_window`` seconds after completion.  If the leader raises one of
+    ``shared_errors`` (deterministic outcomes such as "location not found"),
+    the waiters raise it too; any other failure is not handed on, and the
+    waiters retry, one of them becoming the new leader.  Waiters give up with
+    ``FlightTimeout`` after ``timeout`` seconds, leaving the leader running.
+    """
+
+    def __init__(self, name: str, reuse_window: float = 1.0, timeout: Optional[float] = 60,
+                 shared_errors: Tuple[Type[BaseException], ...] = (), maxsize: int = 1024):
+        self.name = name
+        self.reuse_window = reuse_window
+        self.timeout = timeout
+        self.shared_errors = shared_errors
+        self.results = LRUCache(maxsize=maxsize, ttl=reuse_window)
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.reused = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return ``fn()``, sharing the execution with concurrent callers using the same ``key``."""
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            with self._lock:
+                result = self.results.get(key) if self.reuse_window > 0 else MISSING
+                if result is not MISSING:
+                    self.reused += 1
+                    outcome = "reused"
+                else:
+                    call = self._calls.get(key)
+                    leader = call is None
+                    if leader:
+                        call = self._calls[key] = _Call()
+                        self.executions += 1
+                    else:
+                        self.coalesced += 1
+                    outcome = "leader" if leader else "coalesced"
+            self._count(outcome)
+            if outcome == "reused":
+                return result
+            if leader:
+                return self._lead(key, call, fn)
+
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not call.done.wait(remaining):
+                with self._lock:
+                    self.timeouts += 1
+                self._count("timeout")
+                raise FlightTimeout(f"{self.name}: gave up waiting for {key!r}")
+            if call.error is None:
+                return call.result
+            if isinstance(call.error, self.shared_errors):
+                raise call.error
+            # The leader failed for a reason that may not repeat; try again ourselves
+
+    def _lead(self, key: Hashable, call: _Call, fn: Callable[[], Any]) -> Any:
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.failures += 1
+            self._count("failure")
+            raise
+        else:
+            if self.reuse_window > 0:
+                self.results.set(key, call.result)
+            return call.result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _count(self, outcome: str):
+        count("weather_singleflight_total", "Single-flight calls by outcome.", flight=self.name, outcome=outcome)
+
+    def stats(self) -> Dict:
+        calls = self.executions + self.coalesced + self.reused
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "reused": self.reused,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "coalesce_rate": (self.coalesced + self.reused) / calls if calls else 0.0,
+        }
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+import caching
+import geocoding
+from geocoding import GazetteerBackend, Geocoder, normalize_query
+
+PARIS = {"name": "Paris", "address": "Paris, France", "lat": 48.8566, "lon": 2.3522}
+
+
+class RecordingBackend:
+    """Offline backend that answers from a dict and records every query it receives."""
+
+    name = "recording"
+
+    def __init__(self, places=None, error=None):
+        self.places = places or {}
+        self.error = error
+        self.queries = []
+
+    def search(self, query, limit=geocoding.MAX_RESULTS):
+        self.queries.append(query)
+        if self.error is not None:
+            raise self.error
+        return list(self.places.get(normalize_query(query), []))[:limit]
+
+
+class FakeClock:
+    """Stands in for the ``time`` module of caching and geocoding; both clocks advance together."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(caching, "time", clock)
+    monkeypatch.setattr(geocoding, "time", clock)
+    return clock
+
+
+def test_normalized_queries_share_an_entry():
+    backend = RecordingBackend({"paris,france": [{"address": "Paris, France", "lat": 48.8566, "lon": 2.3522}]})
+    geocoder = Geocoder([backend])
+
+    first = geocoder.geocode("paris, france")
+    assert geocoder.geocode("Paris,France") == first
+    assert geocoder.geocode("  PARIS ,   france ") == first
+    assert backend.queries == ["paris, france"]
+
+
+def test_misses_are_cached_for_negative_ttl(clock):
+    backend = RecordingBackend()
+    geocoder = Geocoder([backend], negative_ttl=60)
+
+    assert geocoder.geocode("Atlantis") is None
+    assert geocoder.geocode("atlantis") is None
+    assert len(backend.queries) == 1
+
+    clock.now += 61
+    assert geocoder.geocode("Atlantis") is None
+    assert len(backend.queries) == 2
+
+
+def test_backend_errors_are_not_cached():
+    backend = RecordingBackend(error=OSError("offline"))
+    geocoder = Geocoder([backend])
+
+    assert geocoder.geocode("Paris") is None
+    assert geocoder.geocode("Paris") is None
+    assert len(backend.queries) == 2
+
+
+def test_sqlite_entries_are_promoted_with_their_remaining_ttl(tmp_path, clock):
+    db_path = str(tmp_path / "geocode.sqlite3")
+    backend = RecordingBackend({"paris": [PARIS]})
+    Geocoder([backend], db_path=db_path, ttl=100).geocode("Paris")
+
+    # A fresh process: empty LRU, same SQLite file
+    clock.now += 90
+    restarted = Geocoder([backend], db_path=db_path, ttl=100)
+    assert restarted.geocode("paris")["lat"] == PARIS["lat"]
+    assert len(backend.queries) == 1
+
+    # The promoted entry expires with the stored one, not a full ttl after promotion
+    clock.now += 11
+    restarted.geocode("paris")
+    assert len(backend.queries) == 2
+
+
+@pytest.mark.parametrize("suffix", [".json", ".csv"])
+def test_gazetteer_from_file(tmp_path, suffix):
+    path = tmp_path / f"places{suffix}"
+    if suffix == ".json":
+        path.write_text(json.dumps([PARIS, {"name": "Lyon", "lat": 45.764, "lon": 4.8357}]))
+    else:
+        path.write_text("name,address,lat,lon\nParis,\"Paris, France\",48.8566,2.3522\nLyon,,45.764,4.8357\n")
+    geocoder = Geocoder([GazetteerBackend.from_file(str(path))])
+
+    # Matches by name or full address; a missing address falls back to the name
+    assert geocoder.geocode("paris") == {"address": "Paris, France", "lat": 48.8566, "lon": 2.3522}
+    assert geocoder.geocode("Paris,France")["lat"] == 48.8566
+    assert geocoder.geocode("LYON") == {"address": "Lyon", "lat": 45.764, "lon": 4.8357}
+    assert geocoder.geocode("Marseille") is None
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import grid_store
+from weather_pred1 import simulate_weather_grid
+
+NOW = np.datetime64("2024-03-01T12:00", "us")
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    # 7 x 8 cells in 3 x 3 chunks, so boxes straddle chunk edges and partial edge chunks
+    return grid_store.build(str(tmp_path_factory.mktemp("grid")), lat=(40, 43, 0.5), lon=(0, 3.5, 0.5),
+                            days_past=1, days_future=1, step_hours=6, chunk=(3, 3), seed=7, now=NOW)
+
+
+@pytest.mark.parametrize("bounds", [
+    (40, 43, 0, 3.5),  # Whole grid
+    (40.9, 42.1, 0.4, 2.6),  # Across chunk edges, bounds between cells
+    (42.5, 50, 3.5, 10),  # Last, partial chunk on both axes
+    (41, 41, 1.5, 1.5),  # Single cell
+])
+def test_bbox_matches_simulation(store, bounds):
+    latitudes, longitudes, columns = store.bbox(*bounds)
+    lat_min, lat_max, lon_min, lon_max = bounds
+    np.testing.assert_array_equal(latitudes,
+                                  store.latitudes[(store.latitudes >= lat_min) & (store.latitudes <= lat_max)])
+    np.testing.assert_array_equal(longitudes,
+                                  store.longitudes[(store.longitudes >= lon_min) & (store.longitudes <= lon_max)])
+
+    step = store.timestamps[1] - store.timestamps[0]
+    expected = simulate_weather_grid(latitudes, longitudes, store.timestamps, step, seed=7)
+    assert set(columns) == set(expected)
+    for name, values in columns.items():
+        assert values.shape == (len(latitudes), len(longitudes), len(store.timestamps))
+        np.testing.assert_allclose(values, expected[name], rtol=1e-6)
+
+
+def test_bbox_agrees_with_point(store):
+    latitudes, longitudes, columns = store.bbox(40.5, 42, 1, 3)
+    for i, latitude in enumerate(latitudes):
+        for j, longitude in enumerate(longitudes):
+            series = store.point(latitude, longitude)
+            for name, values in columns.items():
+                np.testing.assert_array_equal(series[name], values[i, j])
+
+
+def test_empty_bbox(store):
+    latitudes, longitudes, columns = store.bbox(50, 60, 0, 1)
+    assert len(latitudes) == 0
+    assert all(values.shape[0] == 0 for values in columns.values())
+
+
+@pytest.mark.parametrize("latitude", [39, 44, float("inf"), float("nan"), 1e308])
+def test_point_outside_grid(store, latitude):
+    with pytest.raises(ValueError):
+        store.point(latitude, 1)
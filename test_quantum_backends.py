@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from quantum_backends import CirqBackend, NumpyBackend, StateVectorBackend
+
+pytest.importorskip("cirq")
+
+
+@pytest.mark.parametrize("n_qubits", range(1, 7))
+@pytest.mark.parametrize("backend_class", [NumpyBackend, StateVectorBackend])
+def test_matches_cirq(backend_class, n_qubits):
+    params = np.random.default_rng(n_qubits).uniform(-np.pi, np.pi, size=(5, 2 * n_qubits))
+    expected = CirqBackend(n_qubits).evaluate(params)
+    backend = backend_class(n_qubits)
+
+    # Batch path
+    np.testing.assert_allclose(backend.evaluate(params), expected, atol=1e-6)
+    # Single parameter set
+    for row, value in zip(params, expected):
+        assert backend.evaluate(row) == pytest.approx(value, abs=1e-6)
+
+
+def test_statevector_complex64_matches_cirq():
+    params = np.random.default_rng(0).uniform(-np.pi, np.pi, size=(3, 12))
+    np.testing.assert_allclose(StateVectorBackend(6, dtype=np.complex64).evaluate(params),
+                               CirqBackend(6).evaluate(params), atol=1e-5)
+
+
+@pytest.mark.parametrize("group_size", [1, 2, 3, 5, 8])
+def test_statevector_final_state_matches_cirq(group_size):
+    # Group sizes that do and do not divide the qubit count, or exceed it
+    n_qubits = 6
+    params = np.random.default_rng(group_size).uniform(-np.pi, np.pi, size=2 * n_qubits)
+    reference = CirqBackend(n_qubits)
+    expected = reference.simulator.simulate(reference.create_circuit(params)).final_state_vector
+    np.testing.assert_allclose(StateVectorBackend(n_qubits, group_size=group_size).final_state(params),
+                               expected, atol=1e-6)
+
+
+def test_rejects_wrong_shapes():
+    with pytest.raises(ValueError):
+        NumpyBackend(3).evaluate(np.zeros((2, 5)))
+    with pytest.raises(ValueError):
+        NumpyBackend(3).evaluate(np.zeros((2, 2, 6)))
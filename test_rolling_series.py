@@ -0,0 +1,37 @@
+import numpy as np
+
+from rolling_series import RollingSeries
+
+HOUR = np.timedelta64(1, "h")
+START = np.datetime64("2024-03-01T12:30", "us")
+
+
+def slot_values(timestamps, rng):
+    # Each sample records the hour it belongs to, so misplaced slots show up as wrong values
+    return {"hour": ((timestamps - np.datetime64(0, "us")) // HOUR).astype(np.float32)}
+
+
+def expected_hours(now, past_slots, future_slots):
+    first = (now - np.datetime64(0, "us")) // HOUR - past_slots
+    return np.arange(first, first + past_slots + future_slots, dtype=np.float32)
+
+
+def test_refresh_generates_only_elapsed_slots():
+    rolling = RollingSeries(slot_values, HOUR, past_slots=5, future_slots=3)
+
+    assert rolling.refresh(START) == 8
+    assert rolling.refresh(START + np.timedelta64(20, "m")) == 0  # Same slot
+    assert rolling.refresh(START + 2 * HOUR) == 2
+    assert rolling.refresh(START + 9 * HOUR) == 7
+    assert rolling.refresh(START + 30 * HOUR) == 8  # Further than a window: full refill
+    assert rolling.refresh(START) == 8  # Going back in time: full refill
+    assert rolling.slots_generated == 33
+
+
+def test_window_is_contiguous_across_ring_wraparound():
+    rolling = RollingSeries(slot_values, HOUR, past_slots=5, future_slots=3)
+    for hours in [0, 1, 3, 7, 8, 12, 13, 40]:
+        now = START + hours * HOUR
+        window = rolling.window(now)
+        np.testing.assert_array_equal(window["hour"], expected_hours(now, 5, 3))
+        assert abs(window.timestamps[window.now_index] - now) <= np.timedelta64(30, "m")
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+class NotFound(Exception):
+    pass
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def lead_and_wait(flight, leader_fn, waiter_fn):
+    """Run ``leader_fn`` as leader, join a waiter to the same key, then let the leader finish.
+
+    Returns the leader's and the waiter's outcome, each a ``("result" | "error", value)`` pair.
+    """
+    release = threading.Event()
+    outcomes = {}
+
+    def call(name, fn):
+        try:
+            outcomes[name] = ("result", flight.do("key", fn))
+        except Exception as e:
+            outcomes[name] = ("error", e)
+
+    def blocked_leader():
+        release.wait(5)
+        return leader_fn()
+
+    leader = threading.Thread(target=call, args=("leader", blocked_leader))
+    leader.start()
+    wait_until(lambda: flight.stats()["in_flight"] == 1)
+    waiter = threading.Thread(target=call, args=("waiter", waiter_fn))
+    waiter.start()
+    wait_until(lambda: flight.stats()["coalesced"] == 1)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+    return outcomes["leader"], outcomes["waiter"]
+
+
+def test_waiters_share_the_leader_result():
+    flight = SingleFlight("test", reuse_window=0)
+    leader, waiter = lead_and_wait(flight, lambda: 1, lambda: 2)
+    assert leader == waiter == ("result", 1)
+    assert flight.stats()["executions"] == 1
+
+
+def test_waiters_retry_after_an_unshared_error():
+    flight = SingleFlight("test", reuse_window=0, shared_errors=(NotFound,))
+
+    def fail():
+        raise RuntimeError("transient")
+
+    leader, waiter = lead_and_wait(flight, fail, lambda: "retried")
+    assert leader[0] == "error" and isinstance(leader[1], RuntimeError)
+    assert waiter == ("result", "retried")
+    stats = flight.stats()
+    assert (stats["executions"], stats["failures"], stats["in_flight"]) == (2, 1, 0)
+
+
+def test_waiters_raise_shared_errors():
+    flight = SingleFlight("test", reuse_window=0, shared_errors=(NotFound,))
+    error = NotFound("Atlantis")
+
+    def fail():
+        raise error
+
+    leader, waiter = lead_and_wait(flight, fail, lambda: pytest.fail("waiter should not run"))
+    assert leader == waiter == ("error", error)
+    assert flight.stats()["executions"] == 1
+
+
+def test_failures_are_not_reused():
+    flight = SingleFlight("test", reuse_window=60)
+    calls = []
+
+    def flaky():
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+        return len(calls)
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", flaky)
+    assert flight.do("key", flaky) == 2
+    assert flight.do("key", flaky) == 2  # Successes are reused within the window
+    assert flight.stats()["reused"] == 1
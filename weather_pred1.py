@@ -1,121 +1,378 @@
-import base64
-from io import BytesIO
-import cirq
+import time
 import numpy as np
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from typing import List, Tuple, Dict
-from matplotlib.dates import DateFormatter
-from geopy.geocoders import Nominatim
-from scipy.optimize import minimize
+from datetime import datetime
+from typing import Iterator, List, Tuple, Dict, Optional, Sequence, Union
+from geocoding import get_default_geocoder
+from plot_renderer import default_renderer
+from quantum_backends import CirqBackend, get_backend
+from rolling_series import RollingSeries, RollingSeriesStore, default_series_store
+from weather_series import WeatherSeries, nearest_index
+
+
+def time_grid(days_past: float, days_future: float, step_hours: float,
+              now: Optional[np.datetime64] = None) -> Tuple[np.datetime64, np.timedelta64, int]:
+    """Start time, step and sample count of a series spanning ``days_past`` before ``now`` to ``days_future`` after."""
+    now = np.datetime64(datetime.utcnow() if now is None else now, "us")
+    step = np.timedelta64(int(round(step_hours * 3600 * 1e6)), "us")
+    past_start = now - np.timedelta64(int(round(days_past * 86400 * 1e6)), "us")
+    n_samples = int(round((days_past + days_future) * 24 / step_hours))
+    return past_start, step, n_samples
+
+
+ENSEMBLE_QUANTILES = (0.1, 0.5, 0.9)
+
+
+def weather_baseline(latitude: Union[float, np.ndarray], timestamps: np.ndarray) -> Dict[str, np.ndarray]:
+    """Noise-free diurnal and seasonal components shared by every realization at ``timestamps``.
+
+    ``latitude`` may be an array shaped to broadcast against the time axis,
+    e.g. [L, 1] for per-latitude temperature rows.
+    """
+    hours = (timestamps.astype("datetime64[h]") - timestamps.astype("datetime64[D]")).astype(np.int64)
+    day_of_year = (timestamps.astype("datetime64[D]") - timestamps.astype("datetime64[Y]")).astype(np.int64) + 1
+    hour_angle = hours * 2 * np.pi / 24
+
+    base_temp = 30 - np.abs(latitude) / 2
+    hour_factor = -np.cos((hours - 14) * 2 * np.pi / 24) * 5
+    seasonal_factor = np.cos((day_of_year - 172) * 2 * np.pi / 365) * 10
+    return {
+        "temperature": base_temp + hour_factor + seasonal_factor,
+        "humidity": 60 + np.sin(hour_angle) * 10,
+        "thunderstorm_chance": 0.1 * np.abs(np.cos(hour_angle)),
+    }
+
+
+def simulate_weather(latitude: float, timestamps: np.ndarray, rng: np.random.Generator,
+                     members: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Simulate temperature, humidity and thunderstorm chance (%) at datetime64 ``timestamps``.
+
+    With ``members`` set, each array is [members, T]: independent realizations
+    drawn in one call around the same baseline.
+    """
+    baseline = weather_baseline(latitude, timestamps)
+    size = len(timestamps) if members is None else (members, len(timestamps))
+
+    temperature = baseline["temperature"] + rng.normal(0, 1, size)
+    humidity = baseline["humidity"] + rng.normal(0, 5, size)
+    thunderstorm_chance = np.clip(baseline["thunderstorm_chance"] + rng.normal(0, 0.05, size), 0, 1)
+
+    return {
+        "temperature": temperature,
+        "humidity": humidity,
+        "thunderstorm_chance": thunderstorm_chance * 100
+    }
+
+
+GRID_NOISE_SCALES = {"temperature": 1.0, "humidity": 5.0, "thunderstorm_chance": 0.05}
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer: a bijective uint64 hash with good avalanche."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def cell_keys(latitudes: np.ndarray, longitudes: np.ndarray, seed: int = 0) -> np.ndarray:
+    """[L, M] uint64 stream keys from coordinates in micro-degrees, independent of the grid's extent."""
+    lat_e6 = np.round(np.asarray(latitudes, dtype=np.float64) * 1e6).astype(np.int64).astype(np.uint64)
+    lon_e6 = np.round(np.asarray(longitudes, dtype=np.float64) * 1e6).astype(np.int64).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        return _mix64(_mix64(lat_e6 + np.uint64(seed))[:, np.newaxis] ^ lon_e6[np.newaxis, :])
+
+
+def counter_uniform(keys: np.ndarray, counters: np.ndarray) -> np.ndarray:
+    """Uniforms in [0, 1), one per (key, counter) pair; see ``counter_normal``."""
+    with np.errstate(over="ignore"):
+        h = _mix64(np.asarray(keys, dtype=np.uint64)[..., np.newaxis]
+                   + np.asarray(counters, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15))
+    return (h >> np.uint64(11)) * 2.0 ** -53
+
+
+def counter_normal(keys: np.ndarray, counters: np.ndarray) -> np.ndarray:
+    """Standard normals, one per (key, counter) pair, from a counter-based hash.
+
+    Each value depends only on its key and counter, so any sub-grid or time
+    range can be generated on its own and matches the whole-grid result.
+    Broadcasts ``keys[..., None]`` against ``counters``.
+    """
+    golden = np.uint64(0x9E3779B97F4A7C15)
+    with np.errstate(over="ignore"):
+        h1 = _mix64(keys[..., np.newaxis] + np.asarray(counters, dtype=np.uint64) * golden)
+        h2 = _mix64(h1 ^ golden)
+    u1 = 1.0 - (h1 >> np.uint64(11)) * 2.0 ** -53  # (0, 1]
+    u2 = (h2 >> np.uint64(11)) * 2.0 ** -53
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2 * np.pi * u2)
+
+
+def simulate_weather_grid(latitudes: np.ndarray, longitudes: np.ndarray, timestamps: np.ndarray,
+                          step: np.timedelta64, seed: int = 0) -> Dict[str, np.ndarray]:
+    """``simulate_weather`` for every cell of a latitude x longitude grid: [L, M, T] float32 arrays.
+
+    Each cell has its own random stream keyed by its coordinates, and draws
+    are indexed by absolute time slot (``timestamps // step``), so a tile of
+    the grid or a window of the time range reproduces the same values.
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    baseline = weather_baseline(latitudes[:, np.newaxis, np.newaxis], timestamps)
+    keys = cell_keys(latitudes, longitudes, seed)
+    slots = ((timestamps - np.datetime64(0, "us")) // np.timedelta64(step, "us")).astype(np.uint64)
+    shape = (len(latitudes), len(longitudes), len(timestamps))
+
+    grid = {}
+    for i, (name, scale) in enumerate(GRID_NOISE_SCALES.items()):
+        variable_keys = _mix64(keys ^ np.uint64(i + 1))
+        values = np.broadcast_to(baseline[name], shape) + scale * counter_normal(variable_keys, slots)
+        if name == "thunderstorm_chance":
+            values = np.clip(values, 0, 1) * 100
+        grid[name] = values.astype(np.float32)
+    return grid
+
+
+def simulate_ensemble(latitude: float, timestamps: np.ndarray, members: int, rng: np.random.Generator,
+                      quantiles: Sequence[float] = ENSEMBLE_QUANTILES,
+                      thresholds: Optional[Dict[str, Sequence[float]]] = None,
+                      member_chunk: int = 128, max_elements: int = 1 << 22) -> Dict:
+    """Quantiles, exceedance probabilities and mean of a ``members``-member ensemble.
+
+    Members are drawn ``member_chunk`` at a time into a float32 [members, block]
+    buffer per variable, where ``block`` is as many time steps as fit in
+    ``max_elements``; every statistic is then a reduction over axis 0 of that
+    buffer, so peak memory does not grow with the series length.  ``thresholds``
+    maps a variable to values whose exceedance probability P(x > value) is reported.
+    """
+    thresholds = thresholds or {}
+    n_samples = len(timestamps)
+    block = max(1, min(n_samples, max_elements // max(members, 1)))
+    names = ("temperature", "humidity", "thunderstorm_chance")
+
+    result = {
+        "members": members,
+        "quantiles": {name: {q: np.empty(n_samples, dtype=np.float32) for q in quantiles} for name in names},
+        "exceedance": {name: {t: np.empty(n_samples, dtype=np.float32) for t in thresholds.get(name, ())}
+                       for name in names},
+        "mean": {name: np.empty(n_samples, dtype=np.float32) for name in names},
+    }
+    buffers = {name: np.empty((members, block), dtype=np.float32) for name in names}
+    for start in range(0, n_samples, block):
+        stop = min(start + block, n_samples)
+        window = slice(start, stop)
+        for first in range(0, members, member_chunk):
+            last = min(first + member_chunk, members)
+            draws = simulate_weather(latitude, timestamps[window], rng, members=last - first)
+            for name in names:
+                buffers[name][first:last, :stop - start] = draws[name]
+
+        for name in names:
+            values = buffers[name][:, :stop - start]
+            for q, row in zip(quantiles, np.quantile(values, quantiles, axis=0)):
+                result["quantiles"][name][q][window] = row
+            for t in thresholds.get(name, ()):
+                result["exceedance"][name][t][window] = np.count_nonzero(values > t, axis=0) / members
+            result["mean"][name][window] = values.mean(axis=0)
+    return result
+
+
+def ensemble_bands(ensemble: Dict, lower: float = 0.1, upper: float = 0.9) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """``(lower, upper)`` quantile arrays per variable, in the form ``visualize_forecast`` draws."""
+    return {name: (levels[lower], levels[upper]) for name, levels in ensemble["quantiles"].items()}
+
+
+def ensemble_to_json(ensemble: Dict, decimals: int = 4) -> Dict:
+    """JSON-ready ensemble: quantile and threshold keys become strings, arrays become rounded lists."""
+    def encode(values):
+        return np.round(values.astype(np.float64), decimals).tolist()
+
+    return {
+        "members": ensemble["members"],
+        "quantiles": {name: {str(q): encode(v) for q, v in levels.items()}
+                      for name, levels in ensemble["quantiles"].items()},
+        "exceedance": {name: {str(t): encode(v) for t, v in levels.items()}
+                       for name, levels in ensemble["exceedance"].items() if levels},
+        "mean": {name: encode(values) for name, values in ensemble["mean"].items()},
+    }
+
 
 class WeatherQuantumForecaster:
-    def __init__(self, n_qubits: int = 4):
+    def __init__(self, n_qubits: int = 4, backend: str = "numpy"):
         self.n_qubits = n_qubits
-        self.qubits = [cirq.GridQubit(0, i) for i in range(n_qubits)]
-        self.simulator = cirq.Simulator()
-        self.geocoder = Nominatim(user_agent="quantum_weather_app")
+        self.backend = get_backend(backend, n_qubits)
+        self.geocoder = get_default_geocoder()
+        self._cirq_backend = self.backend if isinstance(self.backend, CirqBackend) else None
+
+    @property
+    def cirq_backend(self) -> CirqBackend:
+        """Cirq reference backend, created (and cirq imported) on first use."""
+        if self._cirq_backend is None:
+            self._cirq_backend = CirqBackend(self.n_qubits)
+        return self._cirq_backend
+
+    @property
+    def qubits(self):
+        return self.cirq_backend.qubits
+
+    @property
+    def simulator(self):
+        return self.cirq_backend.simulator
 
     def search_locations(self, query: str) -> List[Dict[str, str]]:
         """Search for locations matching the query."""
-        try:
-            locations = self.geocoder.geocode(query, exactly_one=False)
-            return [{"address": loc.address,
-                     "lat": loc.latitude,
-                     "lon": loc.longitude} for loc in locations[:5]]
-        except Exception as e:
-            print(f"Error searching locations: {e}")
-            return []
+        return self.geocoder.search(query, limit=5)
 
-    def generate_simulated_weather_data(self, latitude: float, days_past: int = 30, days_future: int = 14) -> Tuple[Dict[str, List[float]], List[datetime]]:
-        """Generate simulated weather data for temperature, humidity, and thunderstorm probability."""
-        now = datetime.utcnow()
-        past_start = now - timedelta(days=days_past)
-        future_end = now + timedelta(days=days_future)
+    def simulated_timestamps(self, days_past: float = 30, days_future: float = 14, step_hours: float = 4,
+                             now: Optional[np.datetime64] = None) -> np.ndarray:
+        """Sample times from ``days_past`` before ``now`` to ``days_future`` after it, as datetime64[us]."""
+        past_start, step, n_samples = time_grid(days_past, days_future, step_hours, now)
+        return past_start + step * np.arange(n_samples)
+
+    def generate_weather_arrays(self, latitude: float, days_past: float = 30, days_future: float = 14,
+                                step_hours: float = 4, seed: Optional[int] = None,
+                                now: Optional[np.datetime64] = None) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """Vectorized simulated weather series; reproducible for a given ``seed`` and ``now``."""
+        timestamps = self.simulated_timestamps(days_past, days_future, step_hours, now)
+        rng = np.random.default_rng(seed)
+        return simulate_weather(latitude, timestamps, rng), timestamps
+
+    def generate_weather_series(self, latitude: float, days_past: float = 30, days_future: float = 14,
+                                step_hours: float = 4, seed: Optional[int] = None,
+                                now: Optional[np.datetime64] = None) -> WeatherSeries:
+        """``generate_weather_arrays`` as a WeatherSeries whose ``now_index`` marks the present sample."""
+        now = np.datetime64(datetime.utcnow() if now is None else now, "us")
+        weather_data, timestamps = self.generate_weather_arrays(latitude, days_past, days_future, step_hours, seed, now)
+        return WeatherSeries(timestamps, weather_data, now_index=nearest_index(timestamps, now))
 
-        total_hours = (days_past + days_future) * 6  # Sample every 4 hours
-        timestamps = [past_start + timedelta(hours=4 * i) for i in range(total_hours)]
+    def rolling_weather_series(self, latitude: float, days_past: float = 30, days_future: float = 14,
+                               step_hours: float = 4, now: Optional[np.datetime64] = None,
+                               store: Optional[RollingSeriesStore] = None) -> WeatherSeries:
+        """Like ``generate_weather_series``, but kept per location in ``store`` (default: the
+        process-wide one) so repeat calls only simulate the slots that elapsed since the last one.
 
-        base_temp = 30 - abs(latitude) / 2
-        temperatures, humidity, thunderstorms = [], [], []
+        Samples sit on a ``step_hours`` grid aligned to the Unix epoch rather than at ``now``
+        minus ``days_past``.  The result is a view; see ``RollingSeries``.
+        """
+        step = np.timedelta64(int(round(step_hours * 3600 * 1e6)), "us")
+        past_slots = int(round(days_past * 24 / step_hours))
+        future_slots = int(round(days_future * 24 / step_hours))
 
-        for ts in timestamps:
-            hour_factor = -np.cos((ts.hour - 14) * 2 * np.pi / 24) * 5
-            seasonal_factor = np.cos((ts.timetuple().tm_yday - 172) * 2 * np.pi / 365) * 10
-            noise = np.random.normal(0, 1)
+        def factory():
+            return RollingSeries(lambda timestamps, rng: simulate_weather(latitude, timestamps, rng),
+                                 step, past_slots, future_slots)
 
-            temp = base_temp + hour_factor + seasonal_factor + noise
-            humid = 60 + np.sin(ts.hour * 2 * np.pi / 24) * 10 + np.random.normal(0, 5)
-            thunderstorm_chance = max(0, min(1, 0.1 * abs(np.cos(ts.hour * 2 * np.pi / 24)) + np.random.normal(0, 0.05)))
+        store = store or default_series_store
+        return store.window(("weather", latitude, step, past_slots, future_slots), factory, now)
+
+    def generate_simulated_weather_data(self, latitude: float, days_past: int = 30, days_future: int = 14) -> Tuple[Dict[str, List[float]], List[datetime]]:
+        """Generate simulated weather data for temperature, humidity, and thunderstorm probability."""
+        weather_data, timestamps = self.generate_weather_arrays(latitude, days_past, days_future)
+        return {key: values.tolist() for key, values in weather_data.items()}, timestamps.tolist()
 
-            temperatures.append(temp)
-            humidity.append(humid)
-            thunderstorms.append(thunderstorm_chance * 100)
+    def iter_simulated_weather_data(self, latitude: float, days_past: float = 30, days_future: float = 14,
+                                    step_hours: float = 4, chunk_size: int = 1024, seed: Optional[int] = None,
+                                    now: Optional[np.datetime64] = None) -> Iterator[Tuple[Dict[str, np.ndarray], np.ndarray]]:
+        """Generator form of ``generate_weather_arrays`` yielding at most ``chunk_size`` samples at a time."""
+        past_start, step, n_samples = time_grid(days_past, days_future, step_hours, now)
+        rng = np.random.default_rng(seed)
+        for start in range(0, n_samples, chunk_size):
+            timestamps = past_start + step * np.arange(start, min(start + chunk_size, n_samples))
+            yield simulate_weather(latitude, timestamps, rng), timestamps
 
-        return {
-            "temperature": temperatures,
-            "humidity": humidity,
-            "thunderstorm_chance": thunderstorms
-        }, timestamps
+    def generate_ensemble(self, latitude: float, members: int = 500, days_past: float = 30,
+                          days_future: float = 14, step_hours: float = 4,
+                          quantiles: Sequence[float] = ENSEMBLE_QUANTILES,
+                          thresholds: Optional[Dict[str, Sequence[float]]] = None,
+                          seed: Optional[int] = None, now: Optional[np.datetime64] = None) -> Tuple[Dict, np.ndarray]:
+        """``simulate_ensemble`` over the ``generate_weather_arrays`` time grid; returns ``(ensemble, timestamps)``."""
+        timestamps = self.simulated_timestamps(days_past, days_future, step_hours, now)
+        rng = np.random.default_rng(seed)
+        return simulate_ensemble(latitude, timestamps, members, rng, quantiles, thresholds), timestamps
 
     def normalize_data(self, data: List[float]) -> np.ndarray:
         arr = np.array(data)
         return (arr - np.min(arr)) / (np.max(arr) - np.min(arr))
 
-    def create_quantum_circuit(self, params: np.ndarray) -> cirq.Circuit:
-        circuit = cirq.Circuit()
-        for i, qubit in enumerate(self.qubits):
-            circuit.append(cirq.rx(params[i])(qubit))
-        for i in range(len(self.qubits) - 1):
-            circuit.append(cirq.CNOT(self.qubits[i], self.qubits[i + 1]))
-        for i, qubit in enumerate(self.qubits):
-            circuit.append(cirq.ry(params[i + len(self.qubits)])(qubit))
-        return circuit
-
-    def simulate_circuit(self, params: np.ndarray) -> float:
-        circuit = self.create_quantum_circuit(params)
-        result = self.simulator.simulate(circuit)
-        return np.real(result.final_state_vector[0])
-
-    def train_model(self, temperatures: List[float]) -> Tuple[np.ndarray, float]:
-        normalized_temps = self.normalize_data(temperatures)
-        def cost_function(params):
-            predictions = [self.simulate_circuit(params) for _ in range(10)]  # Sample only a subset
-            return np.mean((predictions - normalized_temps[:10])**2)
+    def create_quantum_circuit(self, params: np.ndarray) -> "cirq.Circuit":
+        return self.cirq_backend.create_circuit(params)
+
+    def simulate_circuit(self, params: np.ndarray) -> Union[float, np.ndarray]:
+        """Real part of amplitude 0 for one parameter set, or for each row of a 2-D batch."""
+        return self.backend.evaluate(params)
+
+    def parameter_shift_gradient(self, params: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Return the prediction and its exact gradient from one batched simulation.
 
-        initial_params = np.random.randn(2 * self.n_qubits)
-        result = minimize(cost_function, initial_params, method='L-BFGS-B')
-        return result.x, result.fun
+        Each angle enters a single exp(-i t P / 2) gate, so the amplitude is
+        A cos(t/2) + B sin(t/2) in it and d/dt = (f(t + pi) - f(t - pi)) / 4.
+        """
+        n_params = len(params)
+        shifts = np.pi * np.eye(n_params)
+        batch = np.vstack([params, params + shifts, params - shifts])
+        values = self.simulate_circuit(batch)
+        gradient = (values[1:n_params + 1] - values[n_params + 1:]) / 4
+        return values[0], gradient
 
-    def visualize_forecast(self, weather_data: Dict[str, List[float]], timestamps: List[datetime], location_name: str):
-        """Visualize forecast with user-friendly plots and return as base64."""
-        now = datetime.utcnow()
-        current_idx = min(range(len(timestamps)), key=lambda i: abs(timestamps[i] - now))
+    def train_model(self, temperatures: List[float], gradient: str = "parameter-shift",
+                    return_stats: bool = False, initial_params: Optional[np.ndarray] = None):
+        """Fit the ansatz to the first 10 normalized temperatures.
+
+        ``gradient`` is "parameter-shift" (exact gradient supplied to L-BFGS-B) or
+        "finite-difference" (SciPy approximates it).  Returns ``(params, cost)``,
+        plus a stats dict when ``return_stats`` is set.  ``initial_params`` warm-starts
+        the optimizer; by default it starts from random parameters.
+        """
+        targets = self.normalize_data(temperatures)[:10]
+        circuit_evaluations = 0
+
+        def cost_function(params):
+            nonlocal circuit_evaluations
+            circuit_evaluations += 1
+            prediction = self.simulate_circuit(params)  # Deterministic, so one evaluation covers the subset
+            return np.mean((prediction - targets)**2)
 
-        plt.figure(figsize=(15, 10))
-        colors = {"past": "skyblue", "present": "limegreen", "future": "salmon"}
+        def cost_and_gradient(params):
+            nonlocal circuit_evaluations
+            circuit_evaluations += 2 * len(params) + 1
+            prediction, prediction_grad = self.parameter_shift_gradient(params)
+            residual = prediction - targets
+            return np.mean(residual**2), 2 * np.mean(residual) * prediction_grad
 
-        for i, (key, values) in enumerate(weather_data.items()):
-            plt.subplot(3, 1, i + 1)
+        from scipy.optimize import minimize
 
-            plt.plot(timestamps[:current_idx], values[:current_idx], color=colors["past"], label=f"Historical {key.capitalize()}", linewidth=2)
-            plt.plot(timestamps[current_idx], values[current_idx], 'o', color=colors["present"], label=f"Current {key.capitalize()}", markersize=8)
-            plt.plot(timestamps[current_idx:], values[current_idx:], '--', color=colors["future"], label=f"Forecast {key.capitalize()}", linewidth=2)
+        if initial_params is None:
+            initial_params = np.random.randn(2 * self.n_qubits)
+        start = time.perf_counter()
+        if gradient == "parameter-shift":
+            result = minimize(cost_and_gradient, initial_params, jac=True, method='L-BFGS-B')
+        elif gradient == "finite-difference":
+            result = minimize(cost_function, initial_params, method='L-BFGS-B')
+        else:
+            raise ValueError(f"Unknown gradient mode '{gradient}'")
+        wall_time = time.perf_counter() - start
 
-            plt.xlabel("Time")
-            plt.ylabel(key.capitalize())
-            plt.title(f"{key.capitalize()} Forecast for {location_name}")
-            plt.grid(True, alpha=0.3)
-            plt.legend(loc="upper left")
-            plt.gca().xaxis.set_major_formatter(DateFormatter("%Y-%m-%d %H:%M"))
-            plt.xticks(rotation=45)
+        if not return_stats:
+            return result.x, result.fun
+        stats = {
+            "gradient": gradient,
+            "iterations": int(result.nit),
+            "evaluations": int(result.nfev),
+            "circuit_evaluations": circuit_evaluations,
+            "wall_time": wall_time,
+            "converged": bool(result.success),
+        }
+        return result.x, result.fun, stats
 
-        plt.tight_layout()
+    def visualize_forecast(self, weather_data: Dict[str, List[float]], timestamps: List[datetime], location_name: str,
+                           bands: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None):
+        """Visualize forecast with user-friendly plots and return as base64.
 
-        buf = BytesIO()
-        plt.savefig(buf, format="png")
-        buf.seek(0)
-        img_str = base64.b64encode(buf.read()).decode("utf-8")
-        buf.close()
+        ``bands`` maps a variable to ``(lower, upper)`` arrays, e.g. ensemble
+        p10/p90 from ``ensemble_bands``, drawn as a shaded region.
+        """
+        return default_renderer.render_base64(weather_data, timestamps, location_name, bands=bands)
 
-        return img_str
+    def visualize_forecast_png(self, weather_data: Dict[str, List[float]], timestamps: List[datetime],
+                               location_name: str, bands: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None
+                               ) -> bytes:
+        """The ``visualize_forecast`` plot as PNG bytes."""
+        return default_renderer.render_png(weather_data, timestamps, location_name, bands=bands)
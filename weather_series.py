@@ -0,0 +1,195 @@
+import gzip
+import json
+import zlib
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NPY_MIMETYPE = "application/x-npy"
+RAW_MIMETYPE = "application/octet-stream"
+JSON_MIMETYPE = "application/json"
+
+# Content codings offered for JSON bodies, in order of preference; smaller bodies are sent as-is
+CONTENT_CODINGS = ("gzip", "deflate")
+MIN_COMPRESS_SIZE = 1024
+
+
+def nearest_index(timestamps: np.ndarray, now: np.datetime64) -> int:
+    """Index of the sorted timestamp closest to ``now``, by binary search."""
+    idx = int(np.searchsorted(timestamps, now))
+    if idx == len(timestamps) or (idx > 0 and now - timestamps[idx - 1] <= timestamps[idx] - now):
+        idx -= 1
+    return idx
+
+
+class WeatherSeries:
+    """Columnar weather series: one datetime64[us] time axis and float32 value columns.
+
+    Slicing returns views that share memory with the parent series, so the
+    past/present/future windows cost nothing to take.  ``timestamps`` may be
+    None for series indexed only by step number (e.g. ``for2`` samples).
+    """
+
+    __slots__ = ("timestamps", "columns", "now_index")
+
+    def __init__(self, timestamps: Optional[np.ndarray], columns: Dict[str, np.ndarray],
+                 now_index: Optional[int] = None):
+        self.timestamps = None if timestamps is None else np.asarray(timestamps, dtype="datetime64[us]")
+        self.columns = {name: np.asarray(values, dtype=np.float32) for name, values in columns.items()}
+        self.now_index = now_index
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple], name: str = "temperature") -> "WeatherSeries":
+        """Build from ``(datetime, value)`` pairs such as ``get_historical_weather_data`` output."""
+        records = list(records)
+        timestamps = np.array([record[0] for record in records], dtype="datetime64[us]")
+        return cls(timestamps, {name: np.array([record[1] for record in records])})
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, names: Sequence[str],
+                    timestamps: Optional[np.ndarray] = None) -> "WeatherSeries":
+        """Build from a [T, len(names)] array such as ``for2.generate_weather_data`` output."""
+        matrix = np.asarray(matrix)
+        return cls(timestamps, {name: matrix[:, i] for i, name in enumerate(names)})
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    def slice(self, start: Optional[int] = None, stop: Optional[int] = None) -> "WeatherSeries":
+        """Zero-copy view of rows ``start:stop``."""
+        window = slice(start, stop)
+        view = WeatherSeries.__new__(WeatherSeries)
+        view.timestamps = None if self.timestamps is None else self.timestamps[window]
+        view.columns = {name: values[window] for name, values in self.columns.items()}
+        now_index = self.now_index
+        if now_index is not None:
+            offset = window.indices(len(self))[0]
+            now_index = now_index - offset if 0 <= now_index - offset < len(view) else None
+        view.now_index = now_index
+        return view
+
+    def copy(self) -> "WeatherSeries":
+        """Series owning its own copy of the data, e.g. to keep a ``RollingSeries`` window."""
+        copied = WeatherSeries.__new__(WeatherSeries)
+        copied.timestamps = None if self.timestamps is None else self.timestamps.copy()
+        copied.columns = {name: values.copy() for name, values in self.columns.items()}
+        copied.now_index = self.now_index
+        return copied
+
+    def _require_now_index(self) -> int:
+        if self.now_index is None:
+            raise ValueError("Series has no present sample (now_index is None)")
+        return self.now_index
+
+    def past(self) -> "WeatherSeries":
+        return self.slice(None, self._require_now_index())
+
+    def present(self) -> "WeatherSeries":
+        now_index = self._require_now_index()
+        return self.slice(now_index, now_index + 1)
+
+    def future(self) -> "WeatherSeries":
+        return self.slice(self._require_now_index(), None)
+
+    def as_matrix(self) -> np.ndarray:
+        return np.column_stack(list(self.columns.values()))
+
+    def to_dict_of_lists(self) -> Dict[str, List[float]]:
+        return {name: values.astype(np.float64).tolist() for name, values in self.columns.items()}
+
+    def timestamps_json(self, time_format: str = "iso") -> Optional[list]:
+        """Timestamps as ISO strings (vectorized, no per-element ``isoformat``) or epoch milliseconds."""
+        if self.timestamps is None:
+            return None
+        if time_format == "epoch_ms":
+            return self.timestamps.astype("datetime64[ms]").astype(np.int64).tolist()
+        return np.datetime_as_string(self.timestamps, unit="us").tolist()
+
+    def to_json_payload(self, time_format: str = "iso", decimals: int = 4) -> Dict:
+        """``{"weather_data": {...}, "timestamps": [...]}`` with values rounded to ``decimals``."""
+        return {
+            "weather_data": {name: np.round(values.astype(np.float64), decimals).tolist()
+                             for name, values in self.columns.items()},
+            "timestamps": self.timestamps_json(time_format),
+        }
+
+    def to_structured(self) -> np.ndarray:
+        """Little-endian structured array with one field per column (and ``timestamp`` if present)."""
+        fields = [] if self.timestamps is None else [("timestamp", "<M8[us]")]
+        fields += [(name, "<f4") for name in self.columns]
+        records = np.empty(len(self), dtype=fields)
+        if self.timestamps is not None:
+            records["timestamp"] = self.timestamps
+        for name, values in self.columns.items():
+            records[name] = values
+        return records
+
+    def to_npy(self) -> bytes:
+        buf = BytesIO()
+        np.save(buf, self.to_structured(), allow_pickle=False)
+        return buf.getvalue()
+
+    def to_raw(self) -> Tuple[bytes, Dict[str, str]]:
+        """Concatenated little-endian arrays (int64 epoch microseconds, then each float32 column)
+        and the headers describing that layout."""
+        parts = []
+        if self.timestamps is not None:
+            parts.append(self.timestamps.view(np.int64).astype("<i8", copy=False).tobytes())
+        parts.extend(values.astype("<f4", copy=False).tobytes() for values in self.columns.values())
+        headers = {
+            "X-Series-Length": str(len(self)),
+            "X-Series-Layout": ",".join((["timestamp:<i8:us"] if self.timestamps is not None else [])
+                                        + [f"{name}:<f4" for name in self.columns]),
+        }
+        return b"".join(parts), headers
+
+
+def negotiate_series_response(series: WeatherSeries, metadata: Dict, extra_json: Optional[Dict] = None,
+                              time_format: str = "iso"):
+    """Flask response for ``series`` in the format preferred by the request's Accept header.
+
+    Binary formats carry ``metadata`` JSON-encoded in an ``X-Series-Metadata``
+    header; JSON merges ``metadata`` and ``extra_json`` into the body.
+    """
+    from flask import Response, jsonify, request
+
+    mimetype = request.accept_mimetypes.best_match([JSON_MIMETYPE, NPY_MIMETYPE, RAW_MIMETYPE], JSON_MIMETYPE)
+    if mimetype == NPY_MIMETYPE:
+        return Response(series.to_npy(), mimetype=NPY_MIMETYPE,
+                        headers={"X-Series-Metadata": json.dumps(metadata)})
+    if mimetype == RAW_MIMETYPE:
+        body, headers = series.to_raw()
+        headers["X-Series-Metadata"] = json.dumps(metadata)
+        return Response(body, mimetype=RAW_MIMETYPE, headers=headers)
+    return compress_response(jsonify(dict(series.to_json_payload(time_format), **metadata, **(extra_json or {}))))
+
+
+def compress_response(response, min_size: int = MIN_COMPRESS_SIZE, level: int = 6):
+    """Encode ``response`` with the gzip or deflate coding the request's Accept-Encoding prefers.
+
+    Responses under ``min_size`` bytes, streamed, non-2xx or already encoded
+    ones are left alone; ``Vary: Accept-Encoding`` is always set so shared
+    caches keep the variants apart.
+    """
+    from flask import request
+
+    response.vary.add("Accept-Encoding")
+    if (response.direct_passthrough or response.is_streamed or not 200 <= response.status_code < 300
+            or "Content-Encoding" in response.headers):
+        return response
+    coding = request.accept_encodings.best_match(CONTENT_CODINGS)
+    body = response.get_data()
+    if coding is None or len(body) < min_size:
+        return response
+    # mtime=0 keeps gzip output byte-identical for identical payloads
+    response.set_data(gzip.compress(body, level, mtime=0) if coding == "gzip" else zlib.compress(body, level))
+    response.headers["Content-Encoding"] = coding
+    return response